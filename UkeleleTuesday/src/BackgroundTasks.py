@@ -0,0 +1,113 @@
+# BackgroundTasks.py
+
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+
+class TaskRunner:
+    """
+    Runs slow work (loading, filtering, chart preparation) on worker threads and hands the
+    results back to the Tk main loop.
+
+    Workers never touch Tk widgets: they put their result on a queue that the main loop polls
+    with master.after, and the callbacks run on the main thread. Tasks share a name per kind
+    of work; submitting a new task under a name supersedes the previous one, which is cancelled
+    if it has not started yet and has its result discarded otherwise.
+    """
+
+    def __init__(self, master, max_workers: int = 2, poll_ms: int = 50,
+                 on_status: Optional[Callable[[str, bool], None]] = None):
+        self.master = master
+        self.poll_ms = poll_ms
+        self.on_status = on_status
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.results = queue.Queue()
+        self.current: Dict[str, int] = {}  # Latest task id for each task name
+        self.futures: Dict[str, Any] = {}
+        self.messages: Dict[str, str] = {}
+        self.next_id = 0
+        self.polling = False
+
+    def submit(self, name: str, func: Callable, *args, message: str = "Working...",
+               on_done: Optional[Callable[[Any], None]] = None,
+               on_error: Optional[Callable[[Exception], None]] = None) -> int:
+        """
+        Runs func(*args) on a worker thread.
+
+        Parameters:
+            name (str): Kind of work, e.g. 'load' or 'filter'. A newer task with the same name supersedes this one.
+            func (Callable): The function to run. It must not use Tk.
+            message (str): Status text shown while the task runs.
+            on_done (Callable): Called on the main thread with the result.
+            on_error (Callable): Called on the main thread with the exception.
+
+        Returns:
+            int: The id of the task.
+        """
+        self.cancel(name)
+        self.next_id += 1
+        task_id = self.next_id
+        self.current[name] = task_id
+        self.messages[name] = message
+
+        def run():
+            try:
+                self.results.put((name, task_id, True, func(*args), on_done, on_error))
+            except Exception as e:
+                self.results.put((name, task_id, False, e, on_done, on_error))
+
+        self.futures[name] = self.executor.submit(run)
+        self._update_status()
+        if not self.polling:
+            self.polling = True
+            self.master.after(self.poll_ms, self._poll)
+        return task_id
+
+    def cancel(self, name: str) -> None:
+        """
+        Cancels the running or queued task with this name; its result will be ignored.
+        """
+        future = self.futures.pop(name, None)
+        if future is not None:
+            future.cancel()
+        self.current.pop(name, None)
+        self.messages.pop(name, None)
+
+    def is_busy(self, name: Optional[str] = None) -> bool:
+        return name in self.current if name else bool(self.current)
+
+    def shutdown(self) -> None:
+        for name in list(self.current):
+            self.cancel(name)
+        self.executor.shutdown(wait=False)
+
+    def _update_status(self) -> None:
+        if self.on_status:
+            busy = bool(self.current)
+            self.on_status(" / ".join(self.messages.values()) if busy else "", busy)
+
+    def _poll(self) -> None:
+        while True:
+            try:
+                name, task_id, ok, value, on_done, on_error = self.results.get_nowait()
+            except queue.Empty:
+                break
+            # Results of superseded or cancelled tasks are dropped
+            if self.current.get(name) != task_id:
+                continue
+            self.current.pop(name)
+            self.futures.pop(name, None)
+            self.messages.pop(name, None)
+            self._update_status()
+            if ok and on_done:
+                on_done(value)
+            elif not ok and on_error:
+                on_error(value)
+            elif not ok:
+                print(f"Background task '{name}' failed: {value}")
+
+        if self.current:
+            self.master.after(self.poll_ms, self._poll)
+        else:
+            self.polling = False
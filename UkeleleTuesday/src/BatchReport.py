@@ -0,0 +1,232 @@
+# BatchReport.py
+"""
+Runs saved filter and chart specs against the song data without a display.
+
+Usage:
+    python BatchReport.py tabdb.csv playdb.csv requestdb.csv reports.json --output reports/
+
+The spec file (JSON, or YAML when PyYAML is installed) lists the reports to produce:
+
+    {"reports": [
+        {"name": "french_sixties",
+         "filters": {"language": ["french"], "year": {"min": 1960, "max": 1969}},
+         "columns": ["song", "artist", "year", "play_date"],
+         "charts": [{"type": "Histogram", "x": "difficulty", "format": "svg"},
+                    {"type": "Bar Plot", "x": "decade", "y": "duration_seconds", "aggregation": "sum"}]}
+    ]}
+
+Every report writes <name>.csv with the filtered rows and one image per chart. With --requests,
+request_fulfilment.csv (when each request was played) and request_backlog.csv (songs with open
+requests) are written as well.
+"""
+
+import argparse
+import json
+import os
+import sys
+import matplotlib
+matplotlib.use("Agg")  # No display needed, must be set before anything imports pyplot
+from matplotlib.figure import Figure
+import pandas as pd
+from typing import Any, Dict, List, Optional
+from ChartData import CHART_TYPES, prepare_chart_data
+from Charts import chart_figure_size, render_chart
+from ColumnMetadata import ColumnMetadata
+from DataLoader import load_dataset, HIDDEN_COLUMNS
+from Multifilter import get_user_filters
+
+IMAGE_FORMATS = ['png', 'svg']
+
+
+def load_spec(spec_path: str) -> Dict[str, Any]:
+    """
+    Reads a report spec file, YAML files need PyYAML.
+    """
+    with open(spec_path) as spec_file:
+        if spec_path.lower().endswith(('.yaml', '.yml')):
+            try:
+                import yaml
+            except ImportError:
+                raise ValueError("PyYAML is required to read YAML spec files, use JSON instead.")
+            spec = yaml.safe_load(spec_file)
+        else:
+            spec = json.load(spec_file)
+
+    if not isinstance(spec, dict) or not isinstance(spec.get('reports'), list):
+        raise ValueError(f"Spec file '{spec_path}' must contain a 'reports' list.")
+    return spec
+
+
+def _convert_bound(column: str, bound: str, value: Any, is_date: bool) -> Any:
+    try:
+        return pd.Timestamp(value) if is_date else float(value)
+    except (ValueError, TypeError):
+        kind = "date" if is_date else "number"
+        raise ValueError(f"filter '{column}' has {bound} '{value}', which is not a {kind}.")
+
+
+def convert_filters(filters: Dict[str, Any], df: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Checks spec filters against the data and converts them to the values the GUI passes to
+    get_user_filters.
+
+    Lists and single values become strings (they are parsed against the column type later),
+    {"min": ..., "max": ...} becomes a (min, max) range with an open end for a missing bound.
+    Ranges need a numeric or date column, dates are given as text such as "2024-01-31".
+
+    Raises:
+        ValueError: If a filter names a column the data does not have or a range does not fit its column.
+    """
+    if not isinstance(filters or {}, dict):
+        raise ValueError("'filters' must map column names to values.")
+
+    converted = {}
+    for column, value in (filters or {}).items():
+        if column not in df.columns:
+            raise ValueError(f"filter column '{column}' does not exist in the data.")
+        if isinstance(value, dict):
+            is_date = pd.api.types.is_datetime64_any_dtype(df[column])
+            if not is_date and not pd.api.types.is_numeric_dtype(df[column]):
+                raise ValueError(f"filter '{column}' is a range, but the column is neither numeric nor a date.")
+            open_end = (pd.NaT, pd.NaT) if is_date else (float('-inf'), float('inf'))
+            converted[column] = tuple(_convert_bound(column, bound, value[bound], is_date)
+                                      if bound in value else default
+                                      for bound, default in zip(['min', 'max'], open_end))
+        elif isinstance(value, list):
+            converted[column] = [str(item) for item in value]
+        else:
+            converted[column] = str(value)
+    return converted
+
+
+def save_chart(df: pd.DataFrame, chart: Dict[str, Any], path: str,
+               session_counts: Optional[pd.DataFrame] = None) -> None:
+    """
+    Draws one chart spec into an image file. session_counts, if given, feed the
+    Cumulative Line Chart of the unfiltered play dates.
+
+    Raises:
+        ValueError: If the chart spec does not fit the data.
+    """
+    chart_type = chart.get('type')
+    if chart_type not in CHART_TYPES:
+        raise ValueError(f"Unknown chart type '{chart_type}', expected one of {CHART_TYPES}.")
+
+    # A Figure without pyplot is not registered anywhere, so it is freed with the last reference
+    fig = Figure(figsize=chart_figure_size(chart_type))
+    x_column = chart.get('x', '')
+    chart_data = prepare_chart_data(df, x_column, chart.get('y', ''), chart_type, chart.get('aggregation', 'average'),
+                                    session_counts=session_counts if x_column == 'play_date' else None)
+    render_chart(fig.add_subplot(), chart_data)
+    fig.tight_layout()
+    fig.savefig(path)
+
+
+def run_report(dataset: Dict[str, Any], report: Dict[str, Any], output_dir: str,
+               metadata: Optional[ColumnMetadata] = None) -> List[str]:
+    """
+    Runs one report against the loaded dataset.
+
+    Parameters:
+        dataset (dict): The result of load_dataset.
+        report (dict): One entry of the spec's 'reports' list.
+        output_dir (str): Directory the outputs are written to.
+        metadata (ColumnMetadata, optional): Metadata of the merged data, used to order the filters.
+
+    Returns:
+        list: Paths of the files written, empty if the report's filters do not fit the data.
+    """
+    name = report.get('name') or 'report'
+    # A bad filter skips this report only, the other reports of the spec still run
+    try:
+        filters = convert_filters(report.get('filters'), dataset['merged'])
+    except ValueError as e:
+        print(f"Warning: report '{name}' was skipped: {e}")
+        return []
+    filtered_df = get_user_filters(dataset['merged'], filters, dataset['filter_index'], metadata)
+    # The maintained per-Tuesday totals only describe the unfiltered play history
+    session_counts = None if filters else dataset['session_counts']
+
+    written = []
+    columns = report.get('columns') or [col for col in filtered_df.columns if col not in HIDDEN_COLUMNS]
+    missing = [col for col in columns if col not in filtered_df.columns]
+    if missing:
+        print(f"Warning: report '{name}' skips unknown columns {missing}.")
+    csv_path = os.path.join(output_dir, f"{name}.csv")
+    filtered_df[[col for col in columns if col in filtered_df.columns]].to_csv(csv_path, index=False)
+    written.append(csv_path)
+
+    for number, chart in enumerate(report.get('charts') or [], start=1):
+        image_format = str(chart.get('format', 'png')).lower()
+        if image_format not in IMAGE_FORMATS:
+            print(f"Warning: report '{name}' chart {number} has unsupported format '{image_format}', using png.")
+            image_format = 'png'
+        chart_name = chart.get('name') or f"{name}_chart{number}"
+        chart_path = os.path.join(output_dir, f"{chart_name}.{image_format}")
+        try:
+            save_chart(filtered_df, chart, chart_path, session_counts)
+        except ValueError as e:
+            print(f"Warning: report '{name}' chart {number} was not drawn: {e}")
+            continue
+        written.append(chart_path)
+
+    return written
+
+
+def write_request_reports(dataset: Dict[str, Any], output_dir: str) -> List[str]:
+    """
+    Writes the request fulfilment and backlog tables of the loaded dataset.
+
+    Returns:
+        list: Paths of the files written, empty if requestdb could not be matched to songs.
+    """
+    analytics = dataset['request_analytics']
+    if analytics is None:
+        print("Warning: requestdb has no 'song' and 'artist' columns, no request reports were written.")
+        return []
+
+    written = []
+    for name in ['fulfilment', 'backlog']:
+        path = os.path.join(output_dir, f"request_{name}.csv")
+        analytics[name].drop(columns=HIDDEN_COLUMNS, errors='ignore').to_csv(path, index=False)
+        written.append(path)
+    print(f"Median days to fulfil a request: {analytics['median_days_to_fulfil']}")
+    return written
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run saved filter and chart specs without the GUI.")
+    parser.add_argument('tabdb', help="Path of the tabdb CSV file")
+    parser.add_argument('playdb', help="Path of the playdb CSV file")
+    parser.add_argument('requestdb', help="Path of the requestdb CSV file")
+    parser.add_argument('spec', help="JSON or YAML file with the reports to run")
+    parser.add_argument('--output', default='reports', help="Directory for the CSV and image outputs")
+    parser.add_argument('--requests', action='store_true', help="Also write the request fulfilment and backlog tables")
+    parser.add_argument('--full-refresh', action='store_true',
+                        help="Rebuild the cached data and play history, e.g. after correcting an older session")
+    args = parser.parse_args(argv)
+
+    try:
+        spec = load_spec(args.spec)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        return 1
+
+    os.makedirs(args.output, exist_ok=True)
+
+    # All reports share one loaded (and usually cached) dataset
+    dataset = load_dataset(args.tabdb, args.playdb, args.requestdb, args.full_refresh)
+    # Described once, every report's filters are planned from the same ranges and counts
+    merged_df = dataset['merged']
+    metadata = ColumnMetadata(merged_df, [col for col in merged_df.columns if col not in HIDDEN_COLUMNS])
+    for report in spec['reports']:
+        for path in run_report(dataset, report, args.output, metadata):
+            print(f"Wrote {path}")
+    if args.requests:
+        for path in write_request_reports(dataset, args.output):
+            print(f"Wrote {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+# Benchmark.py
+"""
+Times the load -> normalize -> filter -> aggregate chain of SongLibrary on generated data.
+
+Usage:
+    python Benchmark.py --songs 5000 --sessions 150 --repeat 5
+
+Run it before and after a change to the shared modules; every GUI and script uses the same code,
+so the numbers apply to all of them.
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from typing import Callable, Dict, List, Tuple
+from SongLibrary import FilterIndex, TermSets, apply_filter, get_user_filters, load_dataset, prepare_chart_data
+
+LANGUAGES = ['english', 'french', 'spanish', 'italian', 'german', 'english,french', 'hawaiian']
+GENDERS = ['male', 'female', 'duet', 'ensemble', 'instrumental']
+SOURCES = ['new', 'old', 'off']
+
+
+def generate_files(directory: str, songs: int, sessions: int, seed: int = 0) -> Tuple[str, str, str]:
+    """
+    Writes a random tabdb, playdb and requestdb of the given size and returns their paths.
+    """
+    rng = np.random.default_rng(seed)
+    names = [f"Song {i}" for i in range(songs)]
+    artists = [f"Artist {i % max(songs // 3, 1)}" for i in range(songs)]
+    tab_df = pd.DataFrame({
+        'song': names,
+        'artist': artists,
+        'year': rng.integers(1950, 2024, songs),
+        'difficulty': rng.integers(1, 6, songs),
+        'duration': [f"{m}:{s:02d}" for m, s in zip(rng.integers(2, 7, songs), rng.integers(0, 60, songs))],
+        'gender': rng.choice(GENDERS, songs),
+        'language': rng.choice(LANGUAGES, songs),
+        'source': rng.choice(SOURCES, songs),
+        'tabber': 'someone',
+    })
+    dates = pd.date_range('2021-01-05', periods=sessions, freq='7D').strftime('%Y%m%d')
+    plays = (rng.random((songs, sessions)) < 0.05).astype(int)
+    play_df = pd.concat([tab_df[['song', 'artist']], pd.DataFrame(plays, columns=dates)], axis=1)
+    requested = rng.choice(songs, size=max(songs // 10, 1))
+    request_df = pd.DataFrame({'song': [names[i] for i in requested], 'artist': [artists[i] for i in requested]})
+
+    paths = tuple(os.path.join(directory, name) for name in ['tabdb.csv', 'playdb.csv', 'requestdb.csv'])
+    for df, path in zip([tab_df, play_df, request_df], paths):
+        df.to_csv(path, index=False)
+    return paths
+
+
+def time_call(func: Callable, repeat: int) -> float:
+    """
+    Returns the best wall time of func() over repeat runs, in milliseconds.
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        # The library reports what it does with print, keep that out of the results
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            func()
+            best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def run_benchmark(songs: int, sessions: int, repeat: int) -> List[Tuple[str, float]]:
+    """
+    Times each step of the chain and returns (step, milliseconds) pairs.
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        paths = generate_files(directory, songs, sessions)
+
+        # The first load builds the play history and the cache, later loads read the cache
+        results.append(("load (cold)", time_call(lambda: load_dataset(*paths), 1)))
+        with contextlib.redirect_stdout(io.StringIO()):
+            dataset = load_dataset(*paths)
+        results.append(("load (cached)", time_call(lambda: load_dataset(*paths), repeat)))
+
+        merged = dataset['merged']
+        filters: Dict[str, object] = {'language': ['french', 'spanish'], 'gender': ['female'], 'year': (1960.0, 1999.0)}
+        results.append(("build filter index", time_call(lambda: FilterIndex(merged), repeat)))
+        results.append(("filter (indexed plan)",
+                        time_call(lambda: get_user_filters(merged, filters, dataset['filter_index']), repeat)))
+        results.append(("filter (one column at a time)",
+                        time_call(lambda: [apply_filter(merged, col, val) for col, val in
+                                           [('language', ['french', 'spanish']), ('gender', ['female']),
+                                            ('year', (1960.0, 1999.0))]], repeat)))
+        results.append(("term match (exact, any)",
+                        time_call(lambda: [TermSets(merged['language']).mask(['english', 'french'], mode)
+                                           for mode in ['exact', 'any']], repeat)))
+
+        for chart_type, x, y in [('Histogram', 'difficulty', ''), ('Bar Plot', 'language', 'duration_seconds'),
+                                 ('Box Plot', 'year', 'gender'), ('Cumulative Line Chart', 'play_date', '')]:
+            results.append((f"aggregate {chart_type}",
+                            time_call(lambda: prepare_chart_data(merged, x, y, chart_type), repeat)))
+        results.append(("rows in merged data", float(len(merged))))
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Time the shared load, filter and chart aggregation steps.")
+    parser.add_argument('--songs', type=int, default=5000, help="Number of songs in the generated tabdb")
+    parser.add_argument('--sessions', type=int, default=150, help="Number of Tuesday columns in the generated playdb")
+    parser.add_argument('--repeat', type=int, default=5, help="Runs per step, the best time is reported")
+    args = parser.parse_args()
+
+    for step, value in run_benchmark(args.songs, args.sessions, args.repeat):
+        unit = "" if step.startswith("rows") else " ms"
+        print(f"{step:<35}{value:>12.1f}{unit}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+# ChartData.py
+
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Optional
+from DateParsing import to_dates
+
+CHART_TYPES = ['Histogram', 'Cumulative Line Chart', 'Pie Chart', 'Scatter Plot', 'Bar Plot', 'Box Plot']
+
+HISTOGRAM_BINS = 10
+KDE_GRID_POINTS = 256
+MAX_SCATTER_POINTS = 5000
+
+
+def _is_categorical(series: pd.Series) -> bool:
+    return (isinstance(series.dtype, pd.CategoricalDtype) or pd.api.types.is_object_dtype(series)
+            or pd.api.types.is_string_dtype(series))
+
+
+def _binned_kde(values: np.ndarray, bin_width: float) -> Dict[str, np.ndarray]:
+    """
+    Gaussian KDE (Scott's bandwidth) evaluated on a fixed grid over the data range, scaled to
+    histogram counts. The values are binned onto the grid first, so the smoothing costs the same
+    for any number of rows.
+    """
+    if len(values) < 2 or np.std(values) == 0:
+        return {}
+    bandwidth = np.std(values, ddof=1) * len(values) ** (-1 / 5)
+    grid = np.linspace(values.min(), values.max(), KDE_GRID_POINTS)
+    step = grid[1] - grid[0]
+    counts = np.bincount(np.rint((values - grid[0]) / step).astype(np.int64), minlength=KDE_GRID_POINTS)
+
+    # Kernel in grid steps, cut off at 4 bandwidths or the width of the grid
+    reach = min(int(np.ceil(4 * bandwidth / step)), KDE_GRID_POINTS - 1)
+    offsets = np.arange(-reach, reach + 1) * step
+    kernel = np.exp(-0.5 * (offsets / bandwidth) ** 2) / (bandwidth * np.sqrt(2 * np.pi))
+    # 'full' keeps the kernel's tails, dropping 'reach' points on each side re-centres it on the grid
+    density = (np.convolve(counts, kernel, mode='full')[reach:reach + KDE_GRID_POINTS] if reach
+               else counts.astype(float) / step)
+    return {'kde_x': grid, 'kde_y': density * bin_width}
+
+
+def _box_stats(df: pd.DataFrame, value_column: str, group_column: str) -> list:
+    """
+    Quartiles, whiskers (furthest values within 1.5 IQR) and outliers of each group, in the
+    form matplotlib's Axes.bxp draws.
+    """
+    values = df[value_column]
+    groups = df[group_column]
+    if isinstance(groups.dtype, pd.CategoricalDtype):
+        # Leave out categories that no longer occur after filtering
+        groups = groups.cat.remove_unused_categories()
+    grouped = values.groupby(groups, observed=True, sort=True)
+    quartiles = grouped.quantile([0.25, 0.5, 0.75]).unstack()
+    if quartiles.empty:
+        return []
+    iqr = quartiles[0.75] - quartiles[0.25]
+    low_fence = (quartiles[0.25] - 1.5 * iqr).reindex(groups).to_numpy()
+    high_fence = (quartiles[0.75] + 1.5 * iqr).reindex(groups).to_numpy()
+
+    inside = (values.to_numpy() >= low_fence) & (values.to_numpy() <= high_fence)
+    outside = ~inside & values.notna().to_numpy()
+    whisker_low = values[inside].groupby(groups[inside], observed=True).min()
+    whisker_high = values[inside].groupby(groups[inside], observed=True).max()
+    outliers = values[outside].groupby(groups[outside], observed=True)
+
+    stats = []
+    for group, row in quartiles.iterrows():
+        stats.append({
+            'label': str(group),
+            'q1': row[0.25],
+            'med': row[0.5],
+            'q3': row[0.75],
+            'whislo': whisker_low.get(group, row[0.25]),
+            'whishi': whisker_high.get(group, row[0.75]),
+            'fliers': outliers.get_group(group).to_numpy() if group in outliers.groups else np.array([]),
+        })
+    return stats
+
+
+def infer_chart_type(df: pd.DataFrame, x_column: str, y_column: str = '') -> str:
+    """
+    Picks a chart type from the column types, for callers that do not let the user choose one.
+
+    Raises:
+        ValueError: If a column is missing or no chart type suits the columns.
+    """
+    for column in [x_column, y_column] if y_column else [x_column]:
+        if column not in df.columns:
+            raise ValueError(f"Column '{column}' not found in filtered data.")
+    x_numeric = pd.api.types.is_numeric_dtype(df[x_column])
+    if not y_column:
+        return 'Histogram' if x_numeric else 'Pie Chart'
+    y_numeric = pd.api.types.is_numeric_dtype(df[y_column])
+    if x_numeric and y_numeric:
+        return 'Scatter Plot'
+    if y_numeric and _is_categorical(df[x_column]):
+        return 'Bar Plot'
+    if x_numeric and _is_categorical(df[y_column]):
+        return 'Box Plot'
+    if _is_categorical(df[x_column]) and _is_categorical(df[y_column]):
+        # The same column twice is its distribution, two columns count the rows of each X value
+        return 'Pie Chart' if x_column == y_column else 'Bar Plot'
+    raise ValueError("Could not determine appropriate plot for selected data.")
+
+
+def prepare_chart_data(df: pd.DataFrame, x_column: str, y_column: str, chart_type: str,
+                       aggregation: str = 'average', max_points: int = MAX_SCATTER_POINTS,
+                       session_counts: Optional[pd.DataFrame] = None) -> Dict[str, Any]:
+    """
+    Reduces the (filtered) rows to the aggregate a chart plots, so drawing the chart costs
+    the number of marks rather than the number of rows. Does not use matplotlib.
+
+    Parameters:
+        df (pd.DataFrame): The (filtered) data to plot.
+        x_column (str): Column for the X axis.
+        y_column (str): Column for the Y axis, not used by Histogram, Cumulative Line Chart and Pie Chart.
+        chart_type (str): One of CHART_TYPES.
+        aggregation (str): 'sum', 'average' or 'count', used by the Bar Plot. A non-numeric Y is always counted.
+        max_points (int): Scatter plots with more rows are drawn from a random sample of this size.
+        session_counts (pd.DataFrame, optional): The maintained per-Tuesday play counts (see PlayHistory).
+            When given, the Cumulative Line Chart plots their running total instead of counting the
+            rows, so only pass them when df is the whole, unfiltered play history.
+
+    Returns:
+        dict: 'type', 'title', 'xlabel', 'ylabel' and the chart's aggregate.
+
+    Raises:
+        ValueError: If a column is missing or the column types do not suit the chart type.
+    """
+    # Check if the X-axis column exists
+    if x_column not in df.columns:
+        raise ValueError(f"Column '{x_column}' not found in filtered data.")
+
+    # Handle Histogram
+    if chart_type == 'Histogram':
+        values = df[x_column]
+        # Categoricals with numeric categories (e.g. 'decade') are plotted by value
+        if isinstance(values.dtype, pd.CategoricalDtype) and pd.api.types.is_numeric_dtype(values.cat.categories):
+            values = values.astype(float)
+        if not pd.api.types.is_numeric_dtype(values):
+            raise ValueError(f"Cannot plot histogram for non-numeric column '{x_column}'.")
+        values = values.dropna().to_numpy(dtype=float)
+        counts, edges = np.histogram(values, bins=HISTOGRAM_BINS)
+        data = {'counts': counts, 'edges': edges}
+        data.update(_binned_kde(values, edges[1] - edges[0]))
+        return dict(data, type=chart_type, title=f"Histogram of {x_column.capitalize()}",
+                    xlabel=x_column.capitalize(), ylabel='Frequency')
+
+    # Handle Cumulative Line Chart
+    if chart_type == 'Cumulative Line Chart':
+        if session_counts is not None:
+            return {'type': chart_type, 'x': pd.DatetimeIndex(session_counts['play_date']),
+                    'y': session_counts['cumulative_plays'].to_numpy(),
+                    'title': 'Cumulative Number of Songs Played Over Time',
+                    'xlabel': 'Date', 'ylabel': 'Cumulative Number of Songs'}
+
+        # YYYYMMDD numbers (e.g. tabdb's 'date') are dates, not nanoseconds since 1970
+        dates = to_dates(df[x_column])
+
+        # Count the songs played on each date
+        cumulative_count = dates.dropna().value_counts().sort_index().cumsum()
+        return {'type': chart_type, 'x': cumulative_count.index, 'y': cumulative_count.to_numpy(),
+                'title': 'Cumulative Number of Songs Played Over Time',
+                'xlabel': 'Date', 'ylabel': 'Cumulative Number of Songs'}
+
+    # Handle Pie Chart
+    if chart_type == 'Pie Chart':
+        counts = df[x_column].value_counts()
+        # Categorical columns also count categories that were filtered out
+        counts = counts[counts > 0]
+        return {'type': chart_type, 'labels': [str(label) for label in counts.index], 'values': counts.to_numpy(),
+                'title': f"Distribution of Songs by {x_column.capitalize()}", 'xlabel': '', 'ylabel': ''}
+
+    # Check if the Y-axis column exists
+    if y_column not in df.columns:
+        raise ValueError(f"Column '{y_column}' not found in filtered data.")
+
+    # Both columns are numeric (Scatter Plot)
+    if chart_type == 'Scatter Plot':
+        if not (pd.api.types.is_numeric_dtype(df[x_column]) and pd.api.types.is_numeric_dtype(df[y_column])):
+            raise ValueError("Both X and Y columns must be numeric for a scatter plot.")
+        points = df[[x_column, y_column]].dropna()
+        title = f"{y_column.capitalize()} vs {x_column.capitalize()}"
+        if max_points and len(points) > max_points:
+            title += f" (sample of {max_points} of {len(points)} points)"
+            points = points.sample(n=max_points, random_state=0)
+        return {'type': chart_type, 'x': points[x_column].to_numpy(), 'y': points[y_column].to_numpy(),
+                'title': title, 'xlabel': x_column.capitalize(), 'ylabel': y_column.capitalize()}
+
+    # X is categorical, Y is numeric or counted (Bar Plot)
+    if chart_type == 'Bar Plot':
+        if not _is_categorical(df[x_column]):
+            raise ValueError("X must be categorical for a bar plot.")
+        grouped = df.groupby(x_column, observed=True)[y_column]
+        if not pd.api.types.is_numeric_dtype(df[y_column]) or (aggregation and aggregation.lower() == 'count'):
+            totals = grouped.count()
+            agg_label = f"Count of {y_column.capitalize()}"
+        elif aggregation and aggregation.lower() == 'sum':
+            totals = grouped.sum()
+            agg_label = f"Total {y_column.capitalize()}"
+        else:
+            totals = grouped.mean()
+            agg_label = f"Average {y_column.capitalize()}"
+        return {'type': chart_type, 'labels': [str(label) for label in totals.index], 'values': totals.to_numpy(),
+                'title': f"{agg_label} by {x_column.capitalize()}",
+                'xlabel': x_column.capitalize(), 'ylabel': agg_label}
+
+    # X is numeric, Y is categorical (Box Plot)
+    if chart_type == 'Box Plot':
+        if not (pd.api.types.is_numeric_dtype(df[x_column]) and _is_categorical(df[y_column])):
+            raise ValueError("X must be numeric and Y must be categorical for a box plot.")
+        return {'type': chart_type, 'stats': _box_stats(df, x_column, y_column),
+                'title': f"Distribution of {x_column.capitalize()} by {y_column.capitalize()}",
+                'xlabel': y_column.capitalize(), 'ylabel': x_column.capitalize()}
+
+    raise ValueError("Could not determine appropriate plot for selected data.")
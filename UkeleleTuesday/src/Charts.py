@@ -0,0 +1,106 @@
+# Charts.py
+
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Optional
+from ChartData import infer_chart_type, prepare_chart_data
+
+
+def chart_figure_size(chart_type: str) -> tuple:
+    """
+    Returns the figure size used for a chart type.
+    """
+    return (8, 8) if chart_type == 'Pie Chart' else (10, 6)
+
+
+def _rotate_x_labels(ax) -> None:
+    for label in ax.get_xticklabels():
+        label.set_rotation(45)
+        label.set_horizontalalignment('right')
+
+
+def draw_weighted_histogram(ax, edges: np.ndarray, counts: np.ndarray, **style) -> list:
+    """
+    Draws a precomputed histogram on the axes, returning its bar patches.
+    """
+    # Weighting one value per bin by its count redraws the histogram without the rows behind it
+    _, _, patches = ax.hist(edges[:-1], bins=edges, weights=counts, **style)
+    return patches
+
+
+def render_chart(ax, chart_data: Dict[str, Any]) -> None:
+    """
+    Draws a chart prepared by prepare_chart_data on the given matplotlib axes.
+
+    Only the aggregate is plotted (histogram bins, group totals, box statistics or sampled
+    points), so this is quick whatever the number of rows behind the chart.
+
+    Parameters:
+        ax: The matplotlib axes to draw on.
+        chart_data (dict): The result of prepare_chart_data.
+    """
+    chart_type = chart_data['type']
+
+    if chart_type == 'Histogram':
+        draw_weighted_histogram(ax, chart_data['edges'], chart_data['counts'], alpha=0.75, edgecolor='white')
+        if 'kde_x' in chart_data:
+            ax.plot(chart_data['kde_x'], chart_data['kde_y'])
+
+    elif chart_type == 'Cumulative Line Chart':
+        ax.plot(chart_data['x'], chart_data['y'], marker='o')
+        _rotate_x_labels(ax)
+
+    elif chart_type == 'Pie Chart':
+        ax.pie(chart_data['values'], labels=chart_data['labels'], autopct='%1.1f%%', startangle=90)
+
+    elif chart_type == 'Scatter Plot':
+        ax.scatter(chart_data['x'], chart_data['y'], s=15)
+
+    elif chart_type == 'Bar Plot':
+        positions = np.arange(len(chart_data['values']))
+        ax.bar(positions, chart_data['values'])
+        ax.set_xticks(positions)
+        ax.set_xticklabels(chart_data['labels'])
+        _rotate_x_labels(ax)
+
+    elif chart_type == 'Box Plot':
+        if chart_data['stats']:
+            ax.bxp(chart_data['stats'])
+        _rotate_x_labels(ax)
+
+    ax.set_title(chart_data['title'])
+    ax.set_xlabel(chart_data['xlabel'])
+    ax.set_ylabel(chart_data['ylabel'])
+
+
+def plot_filtered_data(df: pd.DataFrame, x_column: str, y_column: str = '', chart_type: Optional[str] = None,
+                       aggregation: str = 'average', save_path: Optional[str] = None, show: bool = True) -> None:
+    """
+    Shows a chart of the DataFrame in a pyplot window, for the scripts that do not embed their charts.
+
+    Parameters:
+        df (pd.DataFrame): The (filtered) data to plot.
+        x_column (str): Column for the X axis.
+        y_column (str): Column for the Y axis, optional for some chart types.
+        chart_type (str, optional): One of CHART_TYPES, inferred from the column types when not given.
+        aggregation (str): 'sum', 'average' or 'count', used by the Bar Plot.
+        save_path (str, optional): Also save the chart to this image file.
+        show (bool): Open the pyplot window. With show=False the chart is only saved to save_path.
+
+    Raises:
+        ValueError: If a column is missing or the column types do not suit the chart type.
+    """
+    import matplotlib.pyplot as plt  # Only the interactive scripts need a pyplot window
+
+    chart_type = chart_type or infer_chart_type(df, x_column, y_column)
+    chart_data = prepare_chart_data(df, x_column, y_column, chart_type, aggregation)
+    fig = plt.figure(figsize=chart_figure_size(chart_type))
+    render_chart(fig.add_subplot(), chart_data)
+    fig.tight_layout()
+    if save_path:
+        fig.savefig(save_path)
+    if show:
+        plt.show()
+    else:
+        plt.close(fig)
+
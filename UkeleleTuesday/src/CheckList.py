@@ -0,0 +1,144 @@
+# CheckList.py
+
+from bisect import bisect_left
+from tkinter import Checkbutton, Entry, Frame, IntVar, Label, Scrollbar, StringVar
+import numpy as np
+from typing import Any, List, Sequence
+
+
+class PrefixIndex:
+    """
+    Sorted index over the lowercased text of a list of values for type-ahead search.
+
+    A prefix query is two binary searches, so it stays instant however many values there are.
+    """
+
+    def __init__(self, values: Sequence[Any]):
+        keyed = sorted((str(value).lower(), position) for position, value in enumerate(values))
+        self.keys = [key for key, _ in keyed]
+        self.positions = np.array([position for _, position in keyed], dtype=np.int64)
+
+    def search(self, prefix: str) -> np.ndarray:
+        """
+        Returns the positions (in the original order) of the values starting with the prefix.
+        """
+        prefix = prefix.strip().lower()
+        if not prefix:
+            return np.arange(len(self.keys))
+        low = bisect_left(self.keys, prefix)
+        high = bisect_left(self.keys, prefix + "\uffff")
+        return np.sort(self.positions[low:high])
+
+
+class VirtualCheckList(Frame):
+    """
+    Scrollable list of checkboxes that only creates widgets for the visible rows.
+
+    The same few Checkbuttons are relabelled as the list scrolls and the selection is kept in a
+    set, so opening a column with thousands of values (song, artist) costs the same as a short one.
+    """
+
+    def __init__(self, master, values: Sequence[Any], selected: Sequence[Any] = (), visible_rows: int = 15,
+                 max_text: int = 50, **kwargs):
+        super().__init__(master, **kwargs)
+        self.values = list(values)
+        self.visible_rows = visible_rows
+        self.max_text = max_text
+        self.selected = set(selected)
+        self.prefix_index = PrefixIndex(self.values)
+        self.matches = np.arange(len(self.values))
+        self.start = 0
+
+        self.search_var = StringVar()
+        self.search_var.trace_add("write", lambda *args: self.apply_search())
+        Label(self, text="Search:").grid(row=0, column=0, sticky="w")
+        Entry(self, textvariable=self.search_var).grid(row=0, column=1, columnspan=2, sticky="ew")
+
+        self.rows_frame = Frame(self)
+        self.rows_frame.grid(row=1, column=0, columnspan=2, sticky="nsew")
+        self.scrollbar = Scrollbar(self, orient="vertical", command=self.on_scroll)
+        self.scrollbar.grid(row=1, column=2, sticky="ns")
+        self.status_label = Label(self, anchor="w")
+        self.status_label.grid(row=2, column=0, columnspan=3, sticky="w")
+        self.grid_columnconfigure(1, weight=1)
+        self.grid_rowconfigure(1, weight=1)
+
+        # A fixed pool of checkboxes reused for whichever values are in view
+        self.row_vars = []
+        self.row_buttons = []
+        for row in range(visible_rows):
+            var = IntVar()
+            button = Checkbutton(self.rows_frame, variable=var, anchor="w",
+                                 command=lambda r=row: self.toggle_row(r))
+            button.pack(fill="x", pady=2, padx=10)
+            button.bind("<MouseWheel>", lambda e: self.scroll_rows(-1 if e.delta > 0 else 1))
+            button.bind("<Button-4>", lambda e: self.scroll_rows(-1))
+            button.bind("<Button-5>", lambda e: self.scroll_rows(1))
+            self.row_vars.append(var)
+            self.row_buttons.append(button)
+
+        self.render()
+
+    def selected_values(self) -> List[Any]:
+        """
+        Returns the selected values in list order.
+        """
+        return [value for value in self.values if value in self.selected]
+
+    def clear(self) -> None:
+        """
+        Unticks every value and redraws the visible checkboxes.
+        """
+        self.selected.clear()
+        self.render()
+
+    def apply_search(self) -> None:
+        self.matches = self.prefix_index.search(self.search_var.get())
+        self.start = 0
+        self.render()
+
+    def max_start(self) -> int:
+        return max(len(self.matches) - self.visible_rows, 0)
+
+    def scroll_rows(self, step: int) -> None:
+        self.start = min(max(self.start + step, 0), self.max_start())
+        self.render()
+
+    def on_scroll(self, action, amount, unit=None) -> None:
+        if action == "moveto":
+            self.start = min(max(int(float(amount) * len(self.matches)), 0), self.max_start())
+            self.render()
+        elif action == "scroll":
+            self.scroll_rows(int(amount) * (self.visible_rows if unit == "pages" else 1))
+
+    def toggle_row(self, row: int) -> None:
+        value = self.values[self.matches[self.start + row]]
+        if self.row_vars[row].get():
+            self.selected.add(value)
+        else:
+            self.selected.discard(value)
+        self.status_label.config(text=f"{len(self.matches)} of {len(self.values)} values, {len(self.selected)} selected")
+
+    def render(self) -> None:
+        """
+        Relabels the checkbox pool with the values currently in view.
+        """
+        total = len(self.matches)
+        for row, (var, button) in enumerate(zip(self.row_vars, self.row_buttons)):
+            position = self.start + row
+            if position < total:
+                value = self.values[self.matches[position]]
+                text = str(value)
+                button.config(text=text if len(text) <= self.max_text else text[:self.max_text - 3] + "...",
+                              state="normal")
+                var.set(1 if value in self.selected else 0)
+                if not button.winfo_manager():
+                    button.pack(fill="x", pady=2, padx=10)
+            else:
+                button.pack_forget()
+
+        if total:
+            self.scrollbar.set(self.start / total, min(self.start + self.visible_rows, total) / total)
+        else:
+            self.scrollbar.set(0, 1)
+        self.status_label.config(text=f"{total} of {len(self.values)} values, {len(self.selected)} selected")
@@ -0,0 +1,59 @@
+# ColumnMetadata.py
+
+import pandas as pd
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def describe_column(series: pd.Series) -> Dict[str, Any]:
+    """
+    Computes the metadata the filter screen needs for one column.
+
+    Parameters:
+        series (pd.Series): The column to describe.
+
+    Returns:
+        dict: 'numeric', 'counts' (value -> number of rows), 'ascending' and 'descending'
+              (unique values sorted by their text, as shown in the GUI) and, for numeric
+              columns, 'min' and 'max'.
+    """
+    counts = series.value_counts(dropna=True)
+    # Categorical columns also count categories that do not occur
+    counts = counts[counts > 0]
+    ascending = sorted(counts.index, key=lambda x: str(x))
+    metadata = {
+        'numeric': pd.api.types.is_numeric_dtype(series),
+        'counts': counts,
+        'ascending': ascending,
+        'descending': ascending[::-1],
+    }
+    if metadata['numeric']:
+        metadata['min'] = series.min()
+        metadata['max'] = series.max()
+    return metadata
+
+
+class ColumnMetadata:
+    """
+    Unique values, value counts, pre-sorted orders and numeric ranges for every column,
+    computed once per load so clicking a column or toggling the sort order does no work
+    on the data itself. Build a new instance when the data is reloaded.
+    """
+
+    def __init__(self, df: pd.DataFrame, columns: Optional[List[str]] = None):
+        self.columns = {column: describe_column(df[column]) for column in (columns or df.columns)
+                        if column in df.columns}
+
+    def __contains__(self, column: str) -> bool:
+        return column in self.columns
+
+    def is_numeric(self, column: str) -> bool:
+        return self.columns[column]['numeric']
+
+    def unique_values(self, column: str, ascending: bool = True) -> List[Any]:
+        return self.columns[column]['ascending' if ascending else 'descending']
+
+    def value_counts(self, column: str) -> pd.Series:
+        return self.columns[column]['counts']
+
+    def value_range(self, column: str) -> Tuple[Any, Any]:
+        return self.columns[column]['min'], self.columns[column]['max']
@@ -0,0 +1,210 @@
+# Dashboard.py
+
+import os
+import matplotlib
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from matplotlib.figure import Figure
+from typing import Any, Dict, List, Optional
+from Charts import draw_weighted_histogram
+from DateParsing import parse_yyyymmdd
+from ReadInput import parse_duration_seconds
+from TermMatching import TermSets
+
+# Order in which the dashboard charts are drawn
+DASHBOARD_CHARTS = ['difficulty', 'duration', 'language', 'source', 'decade', 'cumulative', 'gender']
+
+DIFFICULTY_COLOURS = ['#A8D5BA', '#86C38F', '#6BAF75', '#4E965A', '#316E42']
+DURATION_COLOURS = ['#CCE5FF', '#99CCFF', '#66B2FF', '#338AFF', '#0066CC']
+LANGUAGE_COLOURS = {
+    'english': '#1f77b4',
+    'french': '#2ca02c',
+    'italian': '#d62728',
+    'german': '#bcbd22',
+    'none': '#7f7f7f',
+    'portuguese': '#17becf',
+    'unknown': '#8c564b',
+    'spanish': '#006400',
+    'hawaiian': '#e377c2'
+}
+SOURCE_COLOURS = {
+    'new': '#4CAF50',
+    'old': '#FFC107',
+    'off': '#F44336'
+}
+DECADE_COLOURS = {
+    1890: '#F5E6CC',  # Light Beige
+    1900: '#FFFACD',  # Light Yellow
+    1950: '#DFF2BF',  # Light Green
+    1960: '#A9DFBF',  # Soft Mint Green
+    1970: '#73C6B6',  # Soft Teal
+    1980: '#5DADE2',  # Light Blue
+    1990: '#3498DB',  # Medium Blue
+    2000: '#2874A6',  # Indigo
+    2010: '#884EA0',  # Violet
+    2020: '#633974'   # Dark Purple
+}
+LINE_COLOUR = "#4CAF50"
+GENDER_ORDER = ['male', 'female', 'duet', 'ensemble', 'instrumental']
+GENDER_COLOURS = ["#42A5F5", "#FF7043", "#B39DDB", "#26A69A", "#B0BEC5"]
+DEFAULT_COLOUR = '#000000'
+
+
+def _histogram(values: pd.Series, bins: int = 5) -> Dict[str, np.ndarray]:
+    values = pd.to_numeric(values, errors='coerce').dropna().to_numpy(dtype=float)
+    counts, edges = np.histogram(values, bins=bins)
+    return {'counts': counts, 'edges': edges}
+
+
+def compute_dashboard_data(tab_df: pd.DataFrame, term_sets: Optional[Dict[str, TermSets]] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Reduces the song table to the small aggregates each dashboard chart plots.
+
+    The aggregates are computed once in the calling process and are cheap to send to the
+    worker processes that draw the charts.
+
+    Parameters:
+        tab_df (pd.DataFrame): The tabdb song table.
+        term_sets (dict, optional): TermSets of the multi-value columns, built here if not given.
+
+    Returns:
+        dict: Chart name -> the data that chart needs.
+    """
+    data = {}
+    data['difficulty'] = _histogram(tab_df['difficulty'])
+    data['duration'] = _histogram(parse_duration_seconds(tab_df['duration']) / 60)
+
+    # Songs in several languages count once for each language, missing languages are left out
+    languages = (term_sets or {}).get('language') or TermSets(tab_df['language'])
+    data['language'] = {'counts': languages.term_counts(exclude=['(Blanks)', 'unknown'])}
+
+    data['source'] = {'counts': tab_df['source'].value_counts()}
+
+    decades = (pd.to_numeric(tab_df['year'], errors='coerce') // 10) * 10
+    grouped_decades = decades.value_counts().sort_index()
+    grouped_decades.index = grouped_decades.index.astype(int)
+    data['decade'] = {'counts': grouped_decades[grouped_decades > 0]}
+
+    data['cumulative'] = {'counts': parse_yyyymmdd(tab_df['date']).dropna().value_counts().sort_index().cumsum()}
+
+    data['gender'] = {'counts': tab_df['gender'].value_counts().reindex(GENDER_ORDER, fill_value=0)}
+    return data
+
+
+def _draw_histogram(ax, data: Dict[str, np.ndarray], colours: List[str]) -> None:
+    patches = draw_weighted_histogram(ax, data['edges'], data['counts'], edgecolor="#2f2f2f", linewidth=1.5)
+    for patch, colour in zip(patches, colours):
+        patch.set_facecolor(colour)
+
+
+def _draw_counts_bar(ax, counts: pd.Series, palette: Dict[Any, str]) -> None:
+    positions = np.arange(len(counts))
+    ax.bar(positions, counts.to_numpy(), width=0.5,
+           color=[palette.get(value, DEFAULT_COLOUR) for value in counts.index],
+           edgecolor='black', linewidth=1.5)
+    ax.set_xticks(positions)
+    ax.set_xticklabels([str(value) for value in counts.index], rotation=45, ha='right')
+
+
+def draw_dashboard_chart(ax, name: str, data: Dict[str, Any]) -> None:
+    """
+    Draws one dashboard chart from its precomputed aggregate.
+
+    Parameters:
+        ax: The matplotlib axes to draw on.
+        name (str): One of DASHBOARD_CHARTS.
+        data (dict): The entry for name returned by compute_dashboard_data.
+    """
+    if name == 'difficulty':
+        _draw_histogram(ax, data, DIFFICULTY_COLOURS)
+        ax.set_title('Histogram of Songs by Difficulty Level')
+        ax.set_xlabel('Difficulty Level')
+        ax.set_ylabel('Number of Songs')
+
+    elif name == 'duration':
+        _draw_histogram(ax, data, DURATION_COLOURS)
+        ax.set_title('Histogram of Songs by Duration')
+        ax.set_xlabel('Duration in minutes')
+        ax.set_ylabel('Number of Songs')
+
+    elif name == 'language':
+        _draw_counts_bar(ax, data['counts'], LANGUAGE_COLOURS)
+        ax.set_title('Songs by Language')
+        ax.set_xlabel('Languages')
+        ax.set_ylabel('Number of Songs')
+
+    elif name == 'source':
+        _draw_counts_bar(ax, data['counts'], SOURCE_COLOURS)
+        ax.set_title('Songs by Source')
+        ax.set_xlabel('Source')
+        ax.set_ylabel('Number of Songs')
+
+    elif name == 'decade':
+        _draw_counts_bar(ax, data['counts'], DECADE_COLOURS)
+        ax.set_title('Songs by Decade')
+        ax.set_xlabel('Decade')
+        ax.set_ylabel('Number of Songs')
+
+    elif name == 'cumulative':
+        counts = data['counts']
+        ax.plot(counts.index, counts.to_numpy(), color=LINE_COLOUR, linewidth=2)
+        ax.set_title('Number of Songs each Tuesday')
+        ax.set_xlabel('Date')
+        ax.set_ylabel('Number of Songs')
+        # One tick per session day
+        ax.set_xticks(counts.index)
+        ax.set_xticklabels(counts.index.strftime('%Y-%m-%d'), rotation=45, ha='right')
+
+    elif name == 'gender':
+        ax.pie(data['counts'].to_numpy(), colors=GENDER_COLOURS,
+               labels=[gender.capitalize() for gender in GENDER_ORDER])
+        ax.set_title('Pie Chart of Songs by Gender')
+        ax.set_ylabel('')
+
+    else:
+        raise ValueError(f"Unknown dashboard chart '{name}', expected one of {DASHBOARD_CHARTS}.")
+
+
+def save_dashboard_chart(name: str, data: Dict[str, Any], path: str) -> str:
+    """
+    Draws one dashboard chart into an image file and returns its path. Runs in the worker processes.
+    """
+    fig = Figure()
+    draw_dashboard_chart(fig.add_subplot(), name, data)
+    fig.tight_layout()
+    fig.savefig(path)
+    return path
+
+
+def _init_worker() -> None:
+    # Workers only write files, so they never need a display
+    matplotlib.use("Agg")
+
+
+def render_dashboard(tab_df: pd.DataFrame, output_dir: str, image_format: str = 'png',
+                     max_workers: Optional[int] = None, term_sets: Optional[Dict[str, TermSets]] = None) -> List[str]:
+    """
+    Writes every dashboard chart to output_dir, drawing the charts in parallel worker processes.
+
+    Parameters:
+        tab_df (pd.DataFrame): The tabdb song table.
+        output_dir (str): Directory the images are written to, created if needed.
+        image_format (str): 'png' or 'svg'.
+        max_workers (int): Number of worker processes, defaults to one per chart up to the CPU count.
+        term_sets (dict, optional): TermSets of the multi-value columns, see compute_dashboard_data.
+
+    Returns:
+        list: Paths of the images written, in DASHBOARD_CHARTS order.
+    """
+    aggregates = compute_dashboard_data(tab_df, term_sets)
+    os.makedirs(output_dir, exist_ok=True)
+    workers = max_workers or min(len(DASHBOARD_CHARTS), os.cpu_count() or 1)
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        futures = [
+            pool.submit(save_dashboard_chart, name, aggregates[name],
+                        os.path.join(output_dir, f"{name}.{image_format}"))
+            for name in DASHBOARD_CHARTS
+        ]
+        return [future.result() for future in futures]
@@ -0,0 +1,183 @@
+# DataCache.py
+
+import hashlib
+import json
+import os
+import pandas as pd
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Bump this whenever the shape of the prepared DataFrame changes so that old cache files are ignored
+CACHE_VERSION = 7
+CACHE_DIR_NAME = ".ukulele_cache"
+MANIFEST_NAME = "manifest.json"
+
+
+def file_fingerprint(filepath: str, known: Optional[dict] = None) -> dict:
+    """
+    Returns the size, modification time and content hash of a file.
+
+    The content hash is only recomputed when the size or modification time differ
+    from the previously known fingerprint, so unchanged files are never re-read.
+
+    Parameters:
+        filepath (str): Path of the file to fingerprint.
+        known (dict, optional): Fingerprint stored by a previous run.
+
+    Returns:
+        dict: A dictionary with 'size', 'mtime_ns' and 'sha256' keys.
+    """
+    stat = os.stat(filepath)
+    if known and known.get('size') == stat.st_size and known.get('mtime_ns') == stat.st_mtime_ns:
+        return known
+
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': digest.hexdigest()}
+
+
+def get_cache_dir(filepaths: List[str]) -> str:
+    """
+    Returns the cache directory, which lives next to the first input file.
+    """
+    base_dir = os.path.dirname(os.path.abspath(filepaths[0]))
+    return os.path.join(base_dir, CACHE_DIR_NAME)
+
+
+def _read_manifest(cache_dir: str) -> dict:
+    try:
+        with open(os.path.join(cache_dir, MANIFEST_NAME)) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _write_manifest(cache_dir: str, manifest: dict) -> None:
+    with open(os.path.join(cache_dir, MANIFEST_NAME), 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+
+def compute_cache_key(filepaths: List[str], manifest: dict) -> Tuple[str, Dict[str, dict]]:
+    """
+    Computes the cache key for a set of input files.
+
+    Parameters:
+        filepaths (List[str]): The source files the cached data is built from.
+        manifest (dict): The manifest from a previous run (may be empty).
+
+    Returns:
+        tuple: The cache key and the fresh fingerprints keyed by absolute path.
+    """
+    known_files = manifest.get('files', {})
+    fingerprints = {}
+    key_digest = hashlib.sha256(f"v{CACHE_VERSION}".encode())
+    for filepath in filepaths:
+        abs_path = os.path.abspath(filepath)
+        fingerprint = file_fingerprint(abs_path, known_files.get(abs_path))
+        fingerprints[abs_path] = fingerprint
+        key_digest.update(fingerprint['sha256'].encode())
+    return key_digest.hexdigest()[:16], fingerprints
+
+
+def _cache_base(cache_dir: str, key: str) -> str:
+    return os.path.join(cache_dir, f"merged_{key}")
+
+
+def read_frame(base_path: str, fmt: str) -> Optional[pd.DataFrame]:
+    """
+    Reads a DataFrame written by write_frame, returning None if it is missing or unreadable.
+
+    Parameters:
+        base_path (str): Path of the file without its extension.
+        fmt (str): The format returned by write_frame ('parquet' or 'pkl').
+    """
+    path = f"{base_path}.{fmt}"
+    if not os.path.isfile(path):
+        return None
+    try:
+        if fmt == 'parquet':
+            return pd.read_parquet(path)
+        return pd.read_pickle(path)
+    except Exception as e:
+        print(f"Warning: Could not read cache file {path}: {e}")
+        return None
+
+
+def write_frame(base_path: str, df: pd.DataFrame) -> str:
+    """
+    Writes a DataFrame as Parquet, falling back to pickle when no Parquet engine is installed.
+
+    Parameters:
+        base_path (str): Path of the file without its extension.
+        df (pd.DataFrame): The DataFrame to write.
+
+    Returns:
+        str: The format that was written ('parquet' or 'pkl').
+    """
+    parquet_path = f"{base_path}.parquet"
+    try:
+        df.to_parquet(parquet_path, index=False)
+        return 'parquet'
+    except Exception:
+        # No Parquet engine installed, or a column Arrow cannot represent
+        if os.path.exists(parquet_path):
+            os.remove(parquet_path)
+        df.to_pickle(f"{base_path}.pkl")
+        return 'pkl'
+
+
+def _remove_stale_files(cache_dir: str, keep: str) -> None:
+    for name in os.listdir(cache_dir):
+        if name.startswith("merged_") and name != os.path.basename(keep):
+            try:
+                os.remove(os.path.join(cache_dir, name))
+            except OSError:
+                pass
+
+
+def load_or_build(filepaths: List[str], build: Callable[[], Optional[pd.DataFrame]],
+                  cache_dir: Optional[str] = None, refresh: bool = False) -> Optional[pd.DataFrame]:
+    """
+    Returns the prepared DataFrame for the given source files, reusing the on-disk cache when
+    none of the files changed and calling build() otherwise.
+
+    Parameters:
+        filepaths (List[str]): The source files (tabdb, playdb, requestdb).
+        build (Callable): Function that reads the source files and returns the prepared DataFrame.
+        cache_dir (str, optional): Directory for the cache. Defaults to a folder next to the inputs.
+        refresh (bool): Call build() and replace the cached DataFrame even if the files did not change.
+
+    Returns:
+        pd.DataFrame: The prepared DataFrame, or None if build() failed.
+    """
+    cache_dir = cache_dir or get_cache_dir(filepaths)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        manifest = _read_manifest(cache_dir)
+        key, fingerprints = compute_cache_key(filepaths, manifest)
+    except OSError as e:
+        print(f"Warning: Cache disabled ({e}).")
+        return build()
+
+    if not refresh and manifest.get('key') == key:
+        cached_df = read_frame(_cache_base(cache_dir, key), manifest.get('format', 'parquet'))
+        if cached_df is not None:
+            print(f"Loaded prepared data from cache {cache_dir}")
+            if manifest.get('files') != fingerprints:
+                # Files were touched but their contents are unchanged, remember the new timestamps
+                manifest['files'] = fingerprints
+                _write_manifest(cache_dir, manifest)
+            return cached_df
+
+    df = build()
+    if df is None:
+        return None
+
+    try:
+        fmt = write_frame(_cache_base(cache_dir, key), df)
+        _remove_stale_files(cache_dir, f"{_cache_base(cache_dir, key)}.{fmt}")
+        _write_manifest(cache_dir, {'version': CACHE_VERSION, 'key': key, 'format': fmt, 'files': fingerprints})
+    except Exception as e:
+        print(f"Warning: Could not write cache in {cache_dir}: {e}")
+    return df
@@ -0,0 +1,130 @@
+# DataLoader.py
+
+import pandas as pd
+from typing import Dict, Any
+from DataCache import load_or_build, get_cache_dir
+from FilterIndex import FilterIndex
+from PlayHistory import (update_play_history, expand_song_plays, update_session_counts_store, load_session_counts,
+                         build_session_counts)
+from PlayStats import add_play_stats
+from ReadInput import CATEGORICAL_COLUMNS, convert_to_categorical, prepare_song_table
+from RequestAnalytics import analyze_requests
+from SongDictionary import SongDictionary
+
+# Columns that are never shown or exported: personal information and internal keys
+HIDDEN_COLUMNS = ['tabber', 'song_id']
+
+
+def load_song_table(tab_path: str) -> pd.DataFrame:
+    """
+    Reads tabdb and prepares the song-level columns, without the play history.
+    """
+    return prepare_song_table(pd.read_csv(tab_path))
+
+
+def build_merged_data(tab_path: str, play_path: str, dictionary: SongDictionary,
+                      full_refresh: bool = False) -> pd.DataFrame:
+    """
+    Reads tabdb and playdb and builds the merged song/play DataFrame.
+
+    Parameters:
+        tab_path (str): Path of the tabdb CSV file.
+        play_path (str): Path of the playdb CSV file.
+        dictionary (SongDictionary): Assigns the song ids used to join songs and plays.
+        full_refresh (bool): Rebuild the play history from every session of playdb.
+
+    Returns:
+        pd.DataFrame: One row per (song, play date), songs never played appear once with no date.
+    """
+    # Compute the song-level columns once per song and give every song its integer id
+    songs = load_song_table(tab_path)
+    songs['song_id'] = dictionary.assign_ids(songs['song'], songs['artist'])
+    dictionary.save()
+
+    # Only the sessions added to playdb since the last run are melted, older plays come from the cache
+    plays = update_play_history(play_path, dictionary.cache_dir, dictionary, full_refresh)
+
+    # Keep the per-Tuesday play counts of these songs up to date, counting only the new plays
+    update_session_counts_store(dictionary.cache_dir, plays, songs['song_id'].to_numpy())
+
+    # Last play, rolling play counts and gaps become song columns that can be filtered on
+    songs = add_play_stats(songs, plays)
+
+    # The play table only carries the song id and the date, the song columns are gathered by id
+    return expand_song_plays(songs, plays)
+
+
+def song_ids_match(df: pd.DataFrame, dictionary: SongDictionary) -> bool:
+    """
+    Returns True if the song ids of the DataFrame are the ones the dictionary gives its songs.
+    """
+    songs = df.drop_duplicates('song_id')
+    return bool((dictionary.lookup_ids(songs['song'], songs['artist']) == songs['song_id'].to_numpy()).all())
+
+
+def load_requests(request_path: str, dictionary: SongDictionary) -> pd.DataFrame:
+    """
+    Reads requestdb and keys each request by song id so it can be joined with the songs and plays.
+    """
+    request_df = pd.read_csv(request_path)
+    if all(col in request_df.columns for col in ['song', 'artist']):
+        request_df['song_id'] = dictionary.lookup_ids(request_df['song'], request_df['artist'])
+    return request_df
+
+
+def load_dataset(tab_path: str, play_path: str, request_path: str, full_refresh: bool = False) -> Dict[str, Any]:
+    """
+    Loads and prepares everything the GUI and the batch reports work on. Does not use Tk.
+
+    Parameters:
+        tab_path (str): Path of the tabdb CSV file.
+        play_path (str): Path of the playdb CSV file.
+        request_path (str): Path of the requestdb CSV file.
+        full_refresh (bool): Ignore the cached data and rebuild everything, including the play history.
+
+    Returns:
+        dict: 'merged' (the merged song/play DataFrame), 'filter_index' (FilterIndex over it),
+              'session_counts' (plays per Tuesday with running totals), 'requests' (requestdb with
+              song ids), 'request_analytics' (see analyze_requests, None if requestdb has no song
+              and artist) and 'song_dictionary'.
+    """
+    source_paths = [tab_path, play_path, request_path]
+
+    # Song ids are shared by tabdb, playdb and requestdb and persist across runs
+    dictionary = SongDictionary(get_cache_dir(source_paths))
+
+    def build():
+        return build_merged_data(tab_path, play_path, dictionary, full_refresh)
+
+    # Reuse the prepared data from the on-disk cache when none of the CSV files changed
+    merged_df = load_or_build(source_paths, build, refresh=full_refresh)
+    # A cached frame keeps the ids it was built with, which are gone if the dictionary was lost
+    if not song_ids_match(merged_df, dictionary):
+        print("Note: The song ids changed since the data was cached, rebuilding it.")
+        merged_df = load_or_build(source_paths, build, refresh=True)
+    # Parquet gives an ordered integer categorical such as 'decade' back as plain integers,
+    # so a cached frame gets the same dtypes as a freshly built one
+    merged_df = convert_to_categorical(merged_df, CATEGORICAL_COLUMNS)
+
+    # The per-Tuesday play counts are maintained with the play history, count them only if they are missing
+    session_counts = load_session_counts(dictionary.cache_dir)
+    if session_counts is None:
+        session_counts = build_session_counts(merged_df['play_date'])
+
+    # Requests are matched against every play, including plays of songs that are not in tabdb. The
+    # play table is the stored one whether the merged data came from the cache or not, and is only
+    # rebuilt here if it is missing or out of date
+    plays = update_play_history(play_path, dictionary.cache_dir, dictionary)
+    request_df = load_requests(request_path, dictionary)
+    request_analytics = None
+    if 'song_id' in request_df.columns:
+        request_analytics = analyze_requests(request_df, plays)
+
+    return {
+        'merged': merged_df,
+        'filter_index': FilterIndex(merged_df),
+        'session_counts': session_counts,
+        'requests': request_df,
+        'request_analytics': request_analytics,
+        'song_dictionary': dictionary,
+    }
@@ -0,0 +1,54 @@
+# DateParsing.py
+
+import numpy as np
+import pandas as pd
+from typing import Iterable, Union
+
+# Eight digits, optionally followed by the '.0' a float column leaves when it is turned into text
+YYYYMMDD_PATTERN = r'^(\d{8})(?:\.0+)?$'
+
+
+def parse_yyyymmdd(values: Union[pd.Series, Iterable]) -> pd.Series:
+    """
+    Parses YYYYMMDD dates such as 20240109 in one vectorized pass.
+
+    Integer and float columns (a CSV column with blanks is read as floats) are split with integer
+    arithmetic, text is matched against YYYYMMDD_PATTERN. Missing, malformed and impossible dates
+    (e.g. 20240231) become NaT.
+
+    Parameters:
+        values (pd.Series or iterable): The dates as numbers or text.
+
+    Returns:
+        pd.Series: datetime64 values aligned with the input.
+    """
+    values = values if isinstance(values, pd.Series) else pd.Series(list(values), dtype=object)
+
+    if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+        numbers = values.to_numpy(dtype=float)
+        valid = np.isfinite(numbers) & (numbers == np.floor(numbers)) & (numbers >= 10000101) & (numbers <= 99991231)
+        numbers = numbers[valid].astype(np.int64)
+        parts = pd.DataFrame({'year': numbers // 10000, 'month': numbers // 100 % 100, 'day': numbers % 100})
+        dates = np.full(len(values), np.datetime64('NaT'), dtype='datetime64[ns]')
+        dates[valid] = pd.to_datetime(parts, errors='coerce').to_numpy(dtype='datetime64[ns]')
+    else:
+        digits = values.astype('string').str.strip().str.extract(YYYYMMDD_PATTERN, expand=False)
+        dates = pd.to_datetime(digits, format='%Y%m%d', errors='coerce')
+
+    return pd.Series(np.asarray(dates, dtype='datetime64[ns]'), index=values.index, name=values.name)
+
+
+def to_dates(values: pd.Series) -> pd.Series:
+    """
+    Converts a column to datetimes for charts: datetime columns are kept, YYYYMMDD numbers and
+    text are parsed with parse_yyyymmdd and any other text is left to pandas.
+    """
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    dates = parse_yyyymmdd(values)
+    if not pd.api.types.is_numeric_dtype(values):
+        # Text in other layouts, e.g. '2024-01-09', possibly several of them in one column
+        unparsed = dates.isna() & values.notna()
+        if unparsed.any():
+            dates[unparsed] = pd.to_datetime(values[unparsed], format='mixed', errors='coerce')
+    return dates
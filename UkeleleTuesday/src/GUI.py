@@ -1,21 +1,10 @@
 from tkinter import messagebox, simpledialog, filedialog
 
-import matplotlib
-import seaborn as sns
 import pandas as pd
 from tkinter import *
 from typing import Dict, Any
 
-# This sets TkAgg as the backend
-import matplotlib.pyplot as plt
-#matplotlib.use('TkAgg')  # Set the backend to TkAgg
-
-
-from Multifilter import get_user_filters
-
-import pandas as pd
-
-from UkeleleTuesday.src.updatedRebecaCode import apply_filter
+from SongLibrary import CHART_TYPES, build_playdb_totals, get_user_filters, load_song_table, plot_filtered_data
 
 # Dictionary to hold selected filter values for each column
 selected_filters = {}
@@ -244,8 +233,7 @@ def display_results(filtered_df):
                 text="Select Chart Type:",
                 font=("Arial", 12)
             ).pack(pady=5)
-            chart_type_options = ['Histogram', 'Cumulative Line Chart', 'Pie Chart', 'Scatter Plot', 'Bar Plot', 'Box Plot']
-            chart_type_dropdown = OptionMenu(display_frame, chart_type_var, *chart_type_options)
+            chart_type_dropdown = OptionMenu(display_frame, chart_type_var, *CHART_TYPES)
             chart_type_dropdown.pack(pady=5)
 
             # X-axis Selection
@@ -280,8 +268,15 @@ def display_results(filtered_df):
                     )
                     error_label.pack(pady=5)
                     return
+                aggregation = 'average'
+                if chart_type == 'Bar Plot':
+                    # Ask user for aggregation method
+                    aggregation = simpledialog.askstring(
+                        "Aggregation", f"Choose aggregation for {y_column} (sum or average):", initialvalue="average"
+                    ) or 'average'
                 try:
-                    plot_filtered_data(filtered_df, x_column, y_column, chart_type)
+                    plot_filtered_data(filtered_df, x_column, y_column, chart_type, aggregation.lower(),
+                                       save_path=chart_type + "output_plot.png", show=False)
                 except Exception as e:
                     messagebox.showerror("Error", f"An error occurred while plotting: {e}")
 
@@ -297,142 +292,6 @@ def display_results(filtered_df):
         except Exception as e:
             messagebox.showerror("Error", f"An error occurred: {e}")
 
-def plot_filtered_data(df: pd.DataFrame, x_column: str, y_column: str, chart_type: str) -> None:
-    # Check if the X-axis column exists
-    if x_column not in df.columns:
-        messagebox.showerror("Error", f"Column '{x_column}' not found in filtered data.")
-        return
-
-    # Handle Histogram
-    if chart_type == 'Histogram':
-        if pd.api.types.is_numeric_dtype(df[x_column]):
-            plt.figure(figsize=(10, 6))
-            sns.histplot(df[x_column], bins=10, kde=True)
-            plt.title(f"Histogram of {x_column.capitalize()}")
-            plt.xlabel(x_column.capitalize())
-            plt.ylabel('Frequency')
-            plt.tight_layout()
-            plt.savefig(chart_type + "output_plot.png")
-            return
-        else:
-            messagebox.showinfo("Plotting Error", f"Cannot plot histogram for non-numeric column '{x_column}'.")
-            return
-
-    # Handle Cumulative Line Chart
-    elif chart_type == 'Cumulative Line Chart':
-        if x_column not in df.columns:
-            messagebox.showerror("Error", f"The data does not contain '{x_column}' column.")
-            return
-        if not pd.api.types.is_datetime64_any_dtype(df[x_column]):
-            try:
-                df[x_column] = pd.to_datetime(df[x_column], errors='coerce')
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to convert '{x_column}' to datetime: {e}")
-                return
-        df = df.dropna(subset=[x_column])
-        df = df.sort_values(x_column)
-
-        # Group by date and count number of songs played
-        df_grouped = df.groupby(x_column).size().reset_index(name='song_count')
-        df_grouped['cumulative_count'] = df_grouped['song_count'].cumsum()
-
-        plt.figure(figsize=(10, 6))
-        plt.plot(df_grouped[x_column], df_grouped['cumulative_count'], marker='o')
-        plt.title('Cumulative Number of Songs Played Over Time')
-        plt.xlabel('Date')
-        plt.ylabel('Cumulative Number of Songs')
-        plt.xticks(rotation=45)
-        plt.tight_layout()
-        plt.savefig(chart_type + "output_plot.png")
-        return
-
-    # Handle Pie Chart
-    elif chart_type == 'Pie Chart':
-        if x_column in df.columns:
-            counts = df[x_column].value_counts()
-            plt.figure(figsize=(8, 8))
-            counts.plot(kind='pie', autopct='%1.1f%%', startangle=90)
-            plt.title(f"Distribution of Songs by {x_column.capitalize()}")
-            plt.ylabel('')
-            plt.tight_layout()
-            plt.savefig(chart_type + "output_plot.png")
-            return
-        else:
-            messagebox.showerror("Error", f"Column '{x_column}' not found in data.")
-            return
-
-    # Check if the Y-axis column exists
-    if y_column not in df.columns:
-        messagebox.showerror("Error", f"Column '{y_column}' not found in filtered data.")
-        return
-
-    # Both columns are numeric (Scatter Plot)
-    if chart_type == 'Scatter Plot':
-        if pd.api.types.is_numeric_dtype(df[x_column]) and pd.api.types.is_numeric_dtype(df[y_column]):
-            plt.figure(figsize=(10, 6))
-            sns.scatterplot(x=x_column, y=y_column, data=df)
-            plt.title(f"{y_column.capitalize()} vs {x_column.capitalize()}")
-            plt.xlabel(x_column.capitalize())
-            plt.ylabel(y_column.capitalize())
-            plt.tight_layout()
-            plt.show()
-            plt.savefig(chart_type + "output_plot.png")
-            return
-        else:
-            messagebox.showinfo("Plotting Error", "Both X and Y columns must be numeric for a scatter plot.")
-            return
-
-    # X is categorical, Y is numeric (Bar Plot)
-    elif chart_type == 'Bar Plot':
-        if pd.api.types.is_numeric_dtype(df[y_column]) and (
-            pd.api.types.is_categorical_dtype(df[x_column]) or pd.api.types.is_object_dtype(df[x_column])
-        ):
-            # Ask user for aggregation method
-            aggregation = simpledialog.askstring(
-                "Aggregation", f"Choose aggregation for {y_column} (sum or average):", initialvalue="average"
-            )
-            if aggregation and aggregation.lower() == 'sum':
-                df_grouped = df.groupby(x_column)[y_column].sum().reset_index()
-                agg_label = f"Total {y_column.capitalize()}"
-            else:
-                df_grouped = df.groupby(x_column)[y_column].mean().reset_index()
-                agg_label = f"Average {y_column.capitalize()}"
-
-            plt.figure(figsize=(10, 6))
-            sns.barplot(x=x_column, y=y_column, data=df_grouped, ci=None)
-            plt.title(f"{agg_label} by {x_column.capitalize()}")
-            plt.xlabel(x_column.capitalize())
-            plt.ylabel(agg_label)
-            plt.xticks(rotation=45, ha='right')
-            plt.tight_layout()
-            plt.savefig(chart_type + "output_plot.png")
-            return
-        else:
-            messagebox.showinfo("Plotting Error", "X must be categorical and Y must be numeric for a bar plot.")
-            return
-
-    # X is numeric, Y is categorical (Box Plot)
-    elif chart_type == 'Box Plot':
-        if pd.api.types.is_numeric_dtype(df[x_column]) and (
-            pd.api.types.is_categorical_dtype(df[y_column]) or pd.api.types.is_object_dtype(df[y_column])
-        ):
-            plt.figure(figsize=(10, 6))
-            sns.boxplot(x=y_column, y=x_column, data=df)
-            plt.title(f"Distribution of {x_column.capitalize()} by {y_column.capitalize()}")
-            plt.xlabel(y_column.capitalize())
-            plt.ylabel(x_column.capitalize())
-            plt.xticks(rotation=45, ha='right')
-            plt.tight_layout()
-            plt.savefig(chart_type + "output_plot.png")
-            return
-        else:
-            messagebox.showinfo("Plotting Error", "X must be numeric and Y must be categorical for a box plot.")
-            return
-
-    else:
-        messagebox.showinfo("Plotting Error", "Could not determine appropriate plot for selected data.")
-        return
-
 def back_to_filters(results_frame):
     """
     This function hides the filtered results and shows the filter UI again.
@@ -472,8 +331,8 @@ def song_count(play_df, selected_songs):
 
     # Check if any songs match the filter criteria
     if not matching_rows.empty:
-        matching_rows.loc[:, 'total_plays'] = matching_rows.iloc[:, 2:].sum(axis=1).astype(
-            int)  # Assuming the play columns start from the 3rd column
+        # Every song's plays were counted when PLAY_DB was loaded, this only looks them up
+        matching_rows = matching_rows.assign(total_plays=play_totals.plays(matching_rows['song_id']))
         print("Matching Songs and Total Plays:")
         print(matching_rows[['song', 'total_plays']])
         return matching_rows  # Return the DataFrame with matching songs and total plays
@@ -541,6 +400,7 @@ from tkinter import Tk, Frame, Button, filedialog, messagebox
 # Global variables to store the dataframes
 tab_df = None
 play_df = None
+play_totals = None
 request_df = None
 
 # Create the GUI application
@@ -578,18 +438,19 @@ def load_tab_db():
     file_path = filedialog.askopenfilename(title="Select TAB_DB File")
     if file_path:
         try:
-            tab_df = pd.read_csv(file_path)
+            tab_df = load_song_table(file_path)
             messagebox.showinfo("Success", "TAB_DB loaded successfully!")
             create_column_buttons()  # Dynamically create column buttons after loading TAB_DB
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load TAB_DB: {e}")
 
 def load_play_db():
-    global play_df
+    global play_df, play_totals
     file_path = filedialog.askopenfilename(title="Select PLAY_DB File")
     if file_path:
         try:
             play_df = pd.read_csv(file_path)
+            play_totals = build_playdb_totals(play_df)
             messagebox.showinfo("Success", "PLAY_DB loaded successfully!")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load PLAY_DB: {e}")
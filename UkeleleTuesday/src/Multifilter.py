@@ -1,51 +1,196 @@
-from functools import reduce
 import pandas as pd
 import numpy as np
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
+from ColumnMetadata import ColumnMetadata
+from FilterIndex import FilterIndex
 
 
-def apply_filter(df: pd.DataFrame, column: str, value: Any) -> pd.DataFrame:
+def filter_mask(series: pd.Series, column: str, value: Any) -> Optional[np.ndarray]:
     """
-    Apply a filter to the DataFrame based on the column and value(s) provided.
+    Returns a boolean mask of the values in the series that match the filter value(s),
+    or None if the filter cannot be applied to this column.
     """
-    print(f"Applying filter for column '{column}' with value(s): {value}")
-
-    # Check if DataFrame is empty
-    if df.empty:
-        print("The DataFrame is empty. Skipping filtering.")
-        return df
+    # Handle categorical columns by picking the matching categories and comparing integer codes
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        categories = series.cat.categories
+        values = value if isinstance(value, (list, tuple)) else [value]
+        try:
+            if pd.api.types.is_numeric_dtype(categories):
+                if isinstance(value, tuple) and len(value) == 2:  # Range filter (min, max)
+                    matching = (categories >= value[0]) & (categories <= value[1])
+                else:
+                    matching = categories.isin([float(v) for v in values])
+            else:
+                normalized = [str(v).strip().lower() for v in values]
+                matching = categories.str.strip().str.lower().isin(normalized)
+        except (ValueError, TypeError):
+            print(f"Warning: Could not apply categorical filter on column '{column}' with value '{value}'.")
+            return None
+        return np.isin(series.cat.codes.to_numpy(), np.flatnonzero(matching))
 
-    # Check if the column exists
-    if column not in df.columns:
-        print(f"Warning: Column '{column}' does not exist in the DataFrame. Skipping this filter.")
-        return df
+    # Handle date columns, a range may leave either end open (NaT)
+    if pd.api.types.is_datetime64_any_dtype(series):
+        try:
+            if isinstance(value, tuple) and len(value) == 2:  # Range filter (start, end)
+                mask = series.notna()
+                if pd.notna(value[0]):
+                    mask &= series >= pd.Timestamp(value[0])
+                if pd.notna(value[1]):
+                    mask &= series <= pd.Timestamp(value[1])
+                return mask.to_numpy()
+            if isinstance(value, list):  # List of dates
+                return series.isin([pd.Timestamp(v) for v in value]).to_numpy()
+            return (series == pd.Timestamp(value)).to_numpy()
+        except (ValueError, TypeError):
+            print(f"Warning: Could not apply date filter on column '{column}' with value '{value}'.")
+            return None
 
     # Handle numeric columns
-    if pd.api.types.is_numeric_dtype(df[column]):
+    if pd.api.types.is_numeric_dtype(series):
         try:
             if isinstance(value, tuple) and len(value) == 2:  # Range filter (min, max)
-                return df[(df[column] >= value[0]) & (df[column] <= value[1])]
+                return ((series >= value[0]) & (series <= value[1])).to_numpy()
             if isinstance(value, list):  # List of numeric values
                 value = [float(v) for v in value]
-                return df[df[column].isin(value)]
-            return df[df[column] == float(value)]
+                return series.isin(value).to_numpy()
+            return (series == float(value)).to_numpy()
         except (ValueError, TypeError):
             print(f"Warning: Could not apply numeric filter on column '{column}' with value '{value}'.")
-            return df
+            return None
 
     # Handle string columns (normalize for case-insensitive matching)
-    if pd.api.types.is_string_dtype(df[column]):
+    if pd.api.types.is_string_dtype(series):
+        normalized = series.str.strip().str.lower()
         if isinstance(value, list):
             value = [str(v).strip().lower() for v in value]  # Normalize filter values
             print(f"Normalized string filter values for column '{column}': {value}")
-            return df[df[column].str.strip().str.lower().isin(value)]
-        else:
-            value = str(value).strip().lower()
-            return df[df[column].str.strip().str.lower() == value]
+            return normalized.isin(value).to_numpy()
+        return (normalized == str(value).strip().lower()).fillna(False).to_numpy(dtype=bool)
 
     # Handle unsupported column types
     print(f"Warning: Unsupported column type for '{column}'. Skipping this filter.")
-    return df
+    return None
+
+
+def apply_filter(df: pd.DataFrame, column: str, value: Any) -> pd.DataFrame:
+    """
+    Apply a filter to the DataFrame based on the column and value(s) provided.
+    """
+    print(f"Applying filter for column '{column}' with value(s): {value}")
+
+    # Check if DataFrame is empty
+    if df.empty:
+        print("The DataFrame is empty. Skipping filtering.")
+        return df
+
+    # Check if the column exists
+    if column not in df.columns:
+        print(f"Warning: Column '{column}' does not exist in the DataFrame. Skipping this filter.")
+        return df
+
+    mask = filter_mask(df[column], column, value)
+    return df if mask is None else df[mask]
+
+
+def _estimate_selectivity(df: pd.DataFrame, column: str, value: Any,
+                          metadata: Optional[ColumnMetadata] = None) -> float:
+    """
+    Estimates the fraction of rows a filter keeps, used to run the most selective filter first.
+
+    The column's range and number of distinct values come from the load-time metadata when it
+    describes the column, so planning does not scan the data.
+    """
+    if metadata is not None and column in metadata:
+        if not metadata.is_numeric(column):
+            return 0.5
+        low, high = metadata.value_range(column)
+        distinct = len(metadata.value_counts(column))
+    else:
+        if not pd.api.types.is_numeric_dtype(df[column]):
+            return 0.5
+        low, high = df[column].min(), df[column].max()
+        distinct = df[column].nunique()
+    if isinstance(value, tuple):
+        # Assume values are spread evenly between the column's min and max
+        if pd.isna(low) or high <= low:
+            return 1.0
+        return min(max((min(value[1], high) - max(value[0], low)) / (high - low), 0.0), 1.0)
+    if isinstance(value, list):
+        return min(len(value) / max(distinct, 1), 1.0)
+    return 1 / max(distinct, 1)
+
+
+def compile_filter_plan(df: pd.DataFrame, filters: Dict[str, Any], index: Optional[FilterIndex] = None,
+                        metadata: Optional[ColumnMetadata] = None) -> List[dict]:
+    """
+    Turns parsed filters into a list of steps ordered from the most to the least selective.
+
+    Parameters:
+        df (pd.DataFrame): The DataFrame the filters will run on.
+        filters (dict): Parsed filters keyed by column.
+        index (FilterIndex, optional): Index built from df for the categorical columns.
+        metadata (ColumnMetadata, optional): Metadata of df, used to estimate the other filters.
+
+    Returns:
+        list: One dictionary per filter with 'column', 'value', 'rows' and 'selectivity' keys.
+              'rows' holds the matching row positions when the filter is answered by the index.
+    """
+    use_index = index is not None and index.covers(df)
+    plan = []
+    for column, value in filters.items():
+        if column not in df.columns:
+            print(f"Warning: Column '{column}' does not exist in the DataFrame. Skipping this filter.")
+            continue
+        rows = None
+        if use_index and index.has_column(column) and not isinstance(value, tuple):
+            rows = index.rows(column, value)
+        plan.append({
+            'column': column,
+            'value': value,
+            'rows': rows,
+            # An indexed filter already knows exactly how many rows it keeps
+            'selectivity': (len(rows) / max(len(df), 1) if rows is not None
+                            else _estimate_selectivity(df, column, value, metadata)),
+        })
+    plan.sort(key=lambda step: step['selectivity'])
+    return plan
+
+
+def execute_filter_plan(df: pd.DataFrame, plan: List[dict]) -> pd.DataFrame:
+    """
+    Runs a compiled filter plan and selects the matching rows of df in a single step.
+
+    Each filter is only evaluated on the rows that survived the previous ones, so the
+    most selective filter (first in the plan) shrinks the work for all the others.
+    """
+    surviving = None  # Row positions that passed every filter so far
+    for step in plan:
+        column, value = step['column'], step['value']
+        print(f"Applying filter for column '{column}' with value(s): {value}")
+        if surviving is not None and len(surviving) == 0:
+            break
+        if step['rows'] is not None:
+            rows = step['rows']
+            surviving = rows if surviving is None else np.intersect1d(surviving, rows, assume_unique=True)
+            continue
+        series = df[column] if surviving is None else df[column].iloc[surviving]
+        mask = filter_mask(series, column, value)
+        if mask is None:
+            continue
+        surviving = np.flatnonzero(mask) if surviving is None else surviving[mask]
+
+    if surviving is None:
+        return df
+    return df.iloc[surviving]
+
+
+def _parse_date_bound(value: Any) -> Any:
+    # Missing bounds arrive as None, '' or +/-inf from the range entries and spec files
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return pd.NaT
+    if isinstance(value, float) and (np.isinf(value) or np.isnan(value)):
+        return pd.NaT
+    return pd.Timestamp(value.strip() if isinstance(value, str) else value)
 
 
 def parse_filter_input(column: str, filter_value: Any, column_type: Any) -> Any:
@@ -53,6 +198,22 @@ def parse_filter_input(column: str, filter_value: Any, column_type: Any) -> Any:
     Parses the filter value provided by the user and converts it to the correct type.
     """
     try:
+        # Categorical columns are parsed according to the type of their categories
+        if isinstance(column_type, pd.CategoricalDtype):
+            column_type = column_type.categories.dtype
+
+        # Dates are compared as Timestamps, an empty or infinite range end leaves that end open
+        if pd.api.types.is_datetime64_any_dtype(column_type):
+            if isinstance(filter_value, tuple):
+                return tuple(_parse_date_bound(value) for value in filter_value)
+            if isinstance(filter_value, list):
+                return [pd.Timestamp(value.strip() if isinstance(value, str) else value) for value in filter_value]
+            return pd.Timestamp(filter_value.strip() if isinstance(filter_value, str) else filter_value)
+
+        # A (min, max) tuple comes from the range entries of a numeric column
+        if isinstance(filter_value, tuple):
+            return tuple(float(value) for value in filter_value)
+
         # If filter_value is a list, process each item
         if isinstance(filter_value, list):
             parsed_values = []
@@ -70,14 +231,18 @@ def parse_filter_input(column: str, filter_value: Any, column_type: Any) -> Any:
             return filter_value.strip()
 
         return filter_value  # Return as is for unsupported types
-    except (ValueError, AttributeError):
+    except (ValueError, TypeError, AttributeError):
         print(f"Warning: Could not parse '{filter_value}' for column '{column}' with type '{column_type}'.")
         return None
 
 
-def get_user_filters(df: pd.DataFrame, filters: dict) -> pd.DataFrame:
+def get_user_filters(df: pd.DataFrame, filters: dict, index: FilterIndex = None,
+                     metadata: ColumnMetadata = None) -> pd.DataFrame:
     """
     Collects user input for filter criteria and applies the filters to the DataFrame.
+
+    If a FilterIndex built from df is given, categorical filters are answered from the index.
+    If the ColumnMetadata of df is given, the other filters are ordered from its ranges and counts.
     """
     # Check for empty DataFrame
     if df.empty:
@@ -87,6 +252,9 @@ def get_user_filters(df: pd.DataFrame, filters: dict) -> pd.DataFrame:
     parsed_filters = {}  # A dictionary to hold parsed filters for each column
 
     for column, filter_values in filters.items():
+        if column not in df.columns:
+            print(f"Warning: Column '{column}' does not exist in the DataFrame. Skipping this filter.")
+            continue
         column_type = df[column].dtype  # Get column type (numeric, string, etc.)
         parsed_filter = parse_filter_input(column, filter_values, column_type)
 
@@ -101,8 +269,9 @@ def get_user_filters(df: pd.DataFrame, filters: dict) -> pd.DataFrame:
         print("No valid filters provided.")
         return df
 
-    # Apply filters using reduce
-    filtered_df = reduce(lambda df, kv: apply_filter(df, kv[0], kv[1]), parsed_filters.items(), df)
+    # Combine all filters into one plan and select the matching rows once
+    plan = compile_filter_plan(df, parsed_filters, index, metadata)
+    filtered_df = execute_filter_plan(df, plan)
 
     # Check if the filtered DataFrame is empty
     if filtered_df.empty:
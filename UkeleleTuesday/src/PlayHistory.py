@@ -0,0 +1,461 @@
+# PlayHistory.py
+
+import hashlib
+import json
+import os
+import re
+import time
+import numpy as np
+import pandas as pd
+from typing import List, Optional, Union
+from DataCache import read_frame, write_frame
+from DateParsing import parse_yyyymmdd
+from SongDictionary import SongDictionary, normalize_names
+
+HISTORY_NAME = "play_history"
+SESSION_COUNTS_NAME = "session_counts"
+# Bump this whenever the layout of the persisted play table changes
+HISTORY_VERSION = 5
+ID_COLUMNS = ['song', 'artist']
+# Session columns in playdb are named after the Tuesday they were played, e.g. 20240109
+DATE_COLUMN_PATTERN = re.compile(r'^20\d{6}$')
+# Number of playdb rows parsed at a time when ingesting sessions
+CHUNK_ROWS = 5000
+
+
+def get_play_date_columns(columns: List[str]) -> List[str]:
+    """
+    Returns the YYYYMMDD session columns of playdb in file order.
+    """
+    return [col for col in columns if DATE_COLUMN_PATTERN.match(str(col))]
+
+
+def extract_plays(play_df: pd.DataFrame, date_columns: List[str], song_ids: np.ndarray) -> pd.DataFrame:
+    """
+    Extracts one row per play from the given session columns of playdb.
+
+    Instead of melting every song x session cell and throwing the unplayed ones away,
+    the (song row, session) coordinates of the played cells are collected one column at
+    a time, so memory stays proportional to the number of plays.
+
+    Parameters:
+        play_df (pd.DataFrame): The wide playdb with 'song', 'artist' and session columns.
+        date_columns (List[str]): The session columns to extract.
+        song_ids (np.ndarray): The song id of each playdb row.
+
+    Returns:
+        pd.DataFrame: A DataFrame with 'song_id' and 'play_date' columns.
+    """
+    # Parse each session date once instead of once per play, invalid dates are skipped
+    session_dates = parse_yyyymmdd(date_columns)
+
+    song_rows = []
+    date_positions = []
+    for position, col in enumerate(date_columns):
+        if pd.isna(session_dates[position]):
+            continue
+        # A cell equal to 1 means the song was played that Tuesday
+        rows = np.flatnonzero((play_df[col] == 1).to_numpy())
+        song_rows.append(rows)
+        date_positions.append(np.full(len(rows), position, dtype=np.int32))
+
+    song_rows = np.concatenate(song_rows) if song_rows else np.array([], dtype=np.intp)
+    date_positions = np.concatenate(date_positions) if date_positions else np.array([], dtype=np.int32)
+
+    return pd.DataFrame({
+        'song_id': song_ids[song_rows],
+        'play_date': session_dates.to_numpy()[date_positions],
+    })
+
+
+def build_session_counts(play_dates: pd.Series) -> pd.DataFrame:
+    """
+    Counts the plays of each Tuesday session and the running total up to it.
+
+    Parameters:
+        play_dates (pd.Series): The date of every play, missing dates are ignored.
+
+    Returns:
+        pd.DataFrame: One row per session date in date order, with 'play_date', 'plays' and 'cumulative_plays'.
+    """
+    counts = play_dates.dropna().value_counts().sort_index()
+    session_counts = pd.DataFrame({'play_date': counts.index.to_numpy(), 'plays': counts.to_numpy(dtype=np.int64)})
+    session_counts['cumulative_plays'] = session_counts['plays'].cumsum()
+    return session_counts
+
+
+def update_session_counts(session_counts: pd.DataFrame, new_plays: pd.DataFrame) -> pd.DataFrame:
+    """
+    Adds the plays of newly ingested sessions to the per-Tuesday counts.
+
+    New Tuesdays normally come after the stored ones, so only their rows get a running total,
+    continuing from the last stored one. Sessions that fall between stored dates are merged in
+    and the running total is recomputed.
+    """
+    new_counts = build_session_counts(new_plays['play_date'])
+    if new_counts.empty:
+        return session_counts
+    if session_counts.empty:
+        return new_counts
+
+    if new_counts['play_date'].iloc[0] > session_counts['play_date'].iloc[-1]:
+        new_counts['cumulative_plays'] += session_counts['cumulative_plays'].iloc[-1]
+        return pd.concat([session_counts, new_counts], ignore_index=True)
+
+    combined = pd.concat([session_counts, new_counts], ignore_index=True)
+    combined = combined.groupby('play_date', as_index=False)['plays'].sum()
+    combined['cumulative_plays'] = combined['plays'].cumsum()
+    return combined
+
+
+class PlayTotals:
+    """
+    Play counts per song id, overall and per calendar year and month, counted once from the play table.
+
+    Every count is an array indexed by song id, so the plays of any set of songs are a lookup
+    instead of a row-sum over the wide session columns of playdb.
+    """
+
+    def __init__(self, plays: pd.DataFrame, n_ids: int):
+        """
+        Parameters:
+            plays (pd.DataFrame): One row per play with 'song_id' and 'play_date' columns.
+            n_ids (int): Number of song ids, i.e. the largest id plus one.
+        """
+        plays = plays.dropna(subset=['play_date'])
+        song_ids = plays['song_id'].to_numpy(dtype=np.int64)
+        dates = pd.to_datetime(plays['play_date'])
+        n_ids = max(n_ids, int(song_ids.max()) + 1 if len(song_ids) else 0)
+
+        self.total = np.bincount(song_ids, minlength=n_ids)
+        years = dates.dt.year.to_numpy()
+        self.years, self.by_year = self._count_by(years, song_ids, n_ids)
+        # Months are counted as YYYYMM numbers, only the distinct months are formatted as 'YYYY-MM'
+        months, self.by_month = self._count_by(years * 100 + dates.dt.month.to_numpy(), song_ids, n_ids)
+        self.months = [f"{month // 100:04d}-{month % 100:02d}" for month in months]
+
+    @staticmethod
+    def _count_by(periods: np.ndarray, song_ids: np.ndarray, n_ids: int):
+        # One bincount over (period, song id) pairs gives a periods x song ids table
+        codes, labels = pd.factorize(periods, sort=True)
+        counts = np.bincount(codes * n_ids + song_ids, minlength=len(labels) * n_ids)
+        return labels.tolist(), counts.reshape(len(labels), n_ids)
+
+    def plays(self, song_ids: Union[np.ndarray, pd.Series], year: Optional[int] = None,
+              month: Optional[str] = None) -> np.ndarray:
+        """
+        Returns the number of plays of each song id, optionally only in one year or month.
+
+        Parameters:
+            song_ids (array-like): The song ids to look up, ids without plays (or -1) give 0.
+            year (int, optional): Only count plays in this calendar year.
+            month (str, optional): Only count plays in this month, as 'YYYY-MM'.
+
+        Returns:
+            np.ndarray: The int64 play counts, aligned with song_ids.
+        """
+        if month is not None:
+            counts = self.by_month[self.months.index(month)] if month in self.months else None
+        elif year is not None:
+            counts = self.by_year[self.years.index(year)] if year in self.years else None
+        else:
+            counts = self.total
+
+        song_ids = np.asarray(song_ids, dtype=np.int64)
+        result = np.zeros(len(song_ids), dtype=np.int64)
+        if counts is not None:
+            known = (song_ids >= 0) & (song_ids < len(counts))
+            result[known] = counts[song_ids[known]]
+        return result
+
+
+def build_playdb_totals(play_df: pd.DataFrame) -> PlayTotals:
+    """
+    Counts the plays of a playdb read as a whole, for the scripts that do not go through load_dataset.
+
+    Each distinct (song, artist) pair gets a local song id, which is added to play_df as a
+    'song_id' column so the counts can be looked up for any of its rows.
+
+    Parameters:
+        play_df (pd.DataFrame): The wide playdb with 'song', 'artist' and session columns.
+
+    Returns:
+        PlayTotals: The play counts keyed by the new 'song_id' column.
+    """
+    keys = normalize_names(play_df['song']) + "\x1f" + normalize_names(play_df['artist'])
+    song_ids, uniques = pd.factorize(keys)
+    play_df['song_id'] = song_ids.astype(np.int64)
+    plays = extract_plays(play_df, get_play_date_columns(play_df.columns.tolist()), play_df['song_id'].to_numpy())
+    return PlayTotals(plays, len(uniques))
+
+
+def _read_state(cache_dir: str, name: str = HISTORY_NAME) -> dict:
+    try:
+        with open(os.path.join(cache_dir, f"{name}.json")) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_state(cache_dir: str, state: dict, name: str = HISTORY_NAME) -> None:
+    with open(os.path.join(cache_dir, f"{name}.json"), 'w') as f:
+        json.dump(state, f, indent=2)
+
+
+def _update_fingerprints(fingerprints: dict, chunk: pd.DataFrame, columns: List[str]) -> None:
+    # Order-independent digest of who was played in each session: the number of plays and the
+    # wrapping sum of the hashed (song, artist) keys, so editing any played cell changes it
+    keys = normalize_names(chunk['song']) + "\x1f" + normalize_names(chunk['artist'])
+    key_hashes = pd.util.hash_pandas_object(keys, index=False).to_numpy()
+    for col in columns:
+        played = (chunk[col] == 1).to_numpy()
+        count, total = fingerprints.get(col, [0, 0])
+        fingerprints[col] = [count + int(played.sum()), (total + int(key_hashes[played].sum())) % 2 ** 64]
+
+
+def _fingerprint_sessions(play_path: str, columns: List[str]) -> dict:
+    """
+    Returns a fingerprint of the plays in each of the given session columns of playdb.
+    """
+    fingerprints = {}
+    for chunk in pd.read_csv(play_path, usecols=ID_COLUMNS + columns, chunksize=CHUNK_ROWS):
+        _update_fingerprints(fingerprints, chunk, columns)
+    return fingerprints
+
+
+def _leading_digest(play_path: str, last_field: int) -> str:
+    """
+    Hashes every playdb line up to the end of field last_field (0-based). Sessions added as new
+    columns after it leave the digest unchanged, an edit anywhere before it changes the digest.
+    """
+    with open(play_path, 'rb') as f:
+        content = f.read()
+    data = np.frombuffer(content, dtype=np.uint8)
+    # Commas and line breaks inside quoted fields (an odd number of quotes before them) separate nothing
+    quotes = np.flatnonzero(data == ord('"'))
+    separators = np.flatnonzero(data == ord(','))
+    line_ends = np.flatnonzero(data == ord('\n'))
+    if len(quotes):
+        separators = separators[np.searchsorted(quotes, separators) % 2 == 0]
+        line_ends = line_ends[np.searchsorted(quotes, line_ends) % 2 == 0]
+    if not len(line_ends) or line_ends[-1] != len(data) - 1:
+        line_ends = np.append(line_ends, len(data))
+    line_starts = np.concatenate([[0], line_ends[:-1] + 1])
+    line_ends = line_ends - (data[np.maximum(line_ends - 1, 0)] == ord('\r'))
+
+    # The separator after field last_field, or the end of the line when it is the last field
+    cut_index = np.searchsorted(separators, line_starts) + last_field
+    has_cut = cut_index < len(separators)
+    cuts = line_ends.copy()
+    cuts[has_cut] = np.minimum(separators[cut_index[has_cut]], line_ends[has_cut])
+
+    digest = hashlib.sha256()
+    view = memoryview(content)
+    for start, cut in zip(line_starts.tolist(), cuts.tolist()):
+        digest.update(view[start:cut])
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+
+def _file_stamp(play_path: str) -> dict:
+    stat = os.stat(play_path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def _verify_sessions(play_path: str, columns: List[str], processed: List[str], state: dict) -> Optional[list]:
+    """
+    Checks that the ingested sessions of playdb still hold the plays they were ingested with,
+    from the cheapest test to the most expensive: the file's size and modification time, the
+    digest of the leading columns that held them, and only then their plays column by column.
+
+    Returns:
+        list: The verified [last field, digest] of the ingested columns, or None if they changed.
+    """
+    if state.get('file') == _file_stamp(play_path) and state.get('leading'):
+        return state['leading']
+    last_field = max(columns.index(col) for col in processed)
+    leading = [last_field, _leading_digest(play_path, last_field)]
+    if state.get('leading') == leading or _fingerprint_sessions(play_path, processed) == state.get('fingerprints'):
+        return leading
+    return None
+
+
+def update_play_history(play_path: str, cache_dir: str, dictionary: SongDictionary,
+                        full_refresh: bool = False) -> pd.DataFrame:
+    """
+    Returns the long-format play table for playdb, melting only the session columns that
+    were not ingested by a previous run and appending them to the persisted table.
+
+    The table is rebuilt from scratch when playdb is a different file, when the dictionary no
+    longer holds the ids the table was stored with, when a session column that was already
+    ingested disappears, or when its plays differ from the fingerprint stored
+    when it was ingested (an older session was corrected). Only an edit of the file before the
+    last ingested column makes the plays get fingerprinted again, appending sessions does not.
+    full_refresh=True forces a rebuild.
+
+    Parameters:
+        play_path (str): Path of the playdb CSV file.
+        cache_dir (str): Directory where the play table and its state are stored.
+        dictionary (SongDictionary): Assigns the song ids stored in the play table.
+        full_refresh (bool): Ignore the persisted table and melt every session column.
+
+    Returns:
+        pd.DataFrame: A DataFrame with 'song_id' and 'play_date' columns.
+    """
+    # Only the header is needed to find out which sessions are new
+    columns = pd.read_csv(play_path, nrows=0).columns.tolist()
+    if not all(col in columns for col in ID_COLUMNS):
+        raise ValueError("The 'playdb' file must contain 'song' and 'artist' columns.")
+    date_columns = get_play_date_columns(columns)
+
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        cache_usable = True
+    except OSError as e:
+        # The table is built in memory, like load_or_build does when the cache is disabled
+        print(f"Warning: Play history is not cached ({e}).")
+        cache_usable = False
+    state = _read_state(cache_dir) if cache_usable else {}
+    processed = state.get('columns', [])
+    history = None
+    # The stored ids are only meaningful together with the dictionary that assigned them
+    stored_dictionary = state.get('dictionary') or {}
+    reusable = (state.get('version') == HISTORY_VERSION and 0 < stored_dictionary.get('rows', 0) <= len(dictionary)
+                and dictionary.fingerprint(stored_dictionary['rows']) == stored_dictionary)
+    if state.get('version') == HISTORY_VERSION and not reusable and not full_refresh:
+        print("Note: The song ids changed since the play history was stored, rebuilding it.")
+    source = os.path.abspath(play_path)
+    fingerprints = {}
+    leading = None
+    if not full_refresh and reusable and processed and set(processed) <= set(date_columns):
+        if state.get('source') != source:
+            print(f"Note: playdb is now {source}, rebuilding the play history.")
+        else:
+            leading = _verify_sessions(play_path, columns, processed, state)
+            if leading is None:
+                print("Note: Sessions that were already ingested changed in playdb, rebuilding the play history.")
+            else:
+                history = read_frame(os.path.join(cache_dir, HISTORY_NAME), state.get('format', 'parquet'))
+                fingerprints = state['fingerprints']
+    if history is None:
+        processed = []
+        fingerprints = {}
+        leading = None
+        history = pd.DataFrame({'song_id': pd.Series(dtype=np.int64),
+                                'play_date': pd.Series(dtype='datetime64[ns]')})
+        # Marks this build of the table, plays are only ever appended to it until the next rebuild
+        state['built'] = time.time_ns()
+
+    new_columns = [col for col in date_columns if col not in set(processed)]
+    if new_columns:
+        print(f"Ingesting {len(new_columns)} new session column(s) from {play_path}")
+        # Read playdb in chunks so the wide session block is never held in memory all at once
+        reader = pd.read_csv(play_path, usecols=ID_COLUMNS + new_columns, chunksize=CHUNK_ROWS)
+        new_plays = []
+        for chunk in reader:
+            new_plays.append(extract_plays(chunk, new_columns, dictionary.assign_ids(chunk['song'], chunk['artist'])))
+            _update_fingerprints(fingerprints, chunk, new_columns)
+        new_plays = pd.concat(new_plays, ignore_index=True)
+        new_plays = new_plays.sort_values('play_date', kind='stable', ignore_index=True)
+        history = pd.concat([history, new_plays], ignore_index=True) if len(history) else new_plays
+
+    # Nothing to store if the table and the checks it was verified with are unchanged
+    stamp = _file_stamp(play_path)
+    if not cache_usable or (not new_columns and state.get('file') == stamp):
+        return history
+
+    # The table must not refer to ids the next run cannot load, so without them it is not stored
+    if not dictionary.save():
+        return history
+
+    try:
+        fmt = write_frame(os.path.join(cache_dir, HISTORY_NAME), history) if new_columns else state['format']
+        ingested = processed + new_columns
+        if new_columns or leading is None:
+            last_field = max((columns.index(col) for col in ingested), default=0)
+            leading = [last_field, _leading_digest(play_path, last_field)]
+        _write_state(cache_dir, {'version': HISTORY_VERSION, 'source': source, 'format': fmt,
+                                 'built': state.get('built'), 'columns': ingested,
+                                 'fingerprints': fingerprints, 'file': stamp, 'leading': leading,
+                                 'dictionary': dictionary.fingerprint() if new_columns else stored_dictionary})
+    except Exception as e:
+        print(f"Warning: Could not save play history in {cache_dir}: {e}")
+    return history
+
+
+def update_session_counts_store(cache_dir: str, history: pd.DataFrame, song_ids: np.ndarray) -> pd.DataFrame:
+    """
+    Returns the per-Tuesday play counts of the songs in the song table, counting only the plays
+    appended to the play history since the counts were last stored.
+
+    The counts are recomputed from the whole history when the history was rebuilt or the song
+    table now holds a different set of song ids.
+
+    Parameters:
+        cache_dir (str): Directory where the play history and the counts are stored.
+        history (pd.DataFrame): The play table returned by update_play_history.
+        song_ids (np.ndarray): The song id of every row of the song table.
+
+    Returns:
+        pd.DataFrame: One row per session date with 'play_date', 'plays' and 'cumulative_plays'.
+    """
+    built = _read_state(cache_dir).get('built')
+    songs_key = hashlib.sha256(np.sort(song_ids).astype(np.int64).tobytes()).hexdigest()
+    state = _read_state(cache_dir, SESSION_COUNTS_NAME)
+
+    session_counts = None
+    counted = 0
+    if (built and state.get('version') == HISTORY_VERSION and state.get('built') == built
+            and state.get('songs') == songs_key and state.get('rows', 0) <= len(history)):
+        session_counts = read_frame(os.path.join(cache_dir, SESSION_COUNTS_NAME), state.get('format', 'parquet'))
+        counted = state['rows']
+    if session_counts is None:
+        counted = 0
+        session_counts = build_session_counts(pd.Series(dtype='datetime64[ns]'))
+
+    # Each play appears once per song table row with its id, like in the merged view
+    new_plays = history.iloc[counted:]
+    repeats = pd.Series(song_ids).value_counts().reindex(new_plays['song_id'].to_numpy(), fill_value=0)
+    new_dates = pd.DataFrame({'play_date': np.repeat(new_plays['play_date'].to_numpy(), repeats.to_numpy())})
+    session_counts = update_session_counts(session_counts, new_dates)
+    # Without a cache directory (see update_play_history) the counts are only kept in memory
+    if not os.path.isdir(cache_dir):
+        return session_counts
+
+    try:
+        fmt = write_frame(os.path.join(cache_dir, SESSION_COUNTS_NAME), session_counts)
+        _write_state(cache_dir, {'version': HISTORY_VERSION, 'built': built, 'songs': songs_key,
+                                 'rows': len(history), 'format': fmt}, SESSION_COUNTS_NAME)
+    except Exception as e:
+        print(f"Warning: Could not save session counts in {cache_dir}: {e}")
+    return session_counts
+
+
+def load_session_counts(cache_dir: str) -> Optional[pd.DataFrame]:
+    """
+    Returns the per-Tuesday play counts stored by update_session_counts_store, or None if there are none.
+    """
+    state = _read_state(cache_dir, SESSION_COUNTS_NAME)
+    if state.get('version') != HISTORY_VERSION:
+        return None
+    return read_frame(os.path.join(cache_dir, SESSION_COUNTS_NAME), state.get('format', 'parquet'))
+
+
+def expand_song_plays(songs: pd.DataFrame, plays: pd.DataFrame) -> pd.DataFrame:
+    """
+    Builds the merged view with one row per (song, play date), keeping songs that were never played
+    with an empty 'play_date', like a left merge of the song table with the play history.
+
+    Parameters:
+        songs (pd.DataFrame): The prepared song table with a 'song_id' column.
+        plays (pd.DataFrame): The play table with 'song_id' and 'play_date' columns.
+
+    Returns:
+        pd.DataFrame: The song columns repeated for every play, plus 'play_date'.
+    """
+    # Join on the integer song id only, then gather the song columns by position
+    rows = pd.DataFrame({'song_id': songs['song_id'].to_numpy(), 'row': np.arange(len(songs))})
+    links = pd.merge(rows, plays, on='song_id', how='left')
+    merged_df = songs.take(links['row'].to_numpy()).reset_index(drop=True)
+    merged_df['play_date'] = links['play_date'].to_numpy()
+    return merged_df
@@ -0,0 +1,77 @@
+# PlayStats.py
+
+import numpy as np
+import pandas as pd
+from typing import List, Optional
+
+# Lengths of the rolling windows, in weeks, that plays are counted over
+ROLLING_WEEKS = [4, 12, 52]
+PLAY_STAT_COLUMNS = (['last_played', 'days_since_played'] + [f"plays_{weeks}w" for weeks in ROLLING_WEEKS]
+                     + ['median_gap_days'])
+
+
+def compute_play_stats(plays: pd.DataFrame, as_of: Optional[pd.Timestamp] = None,
+                       rolling_weeks: Optional[List[int]] = None) -> pd.DataFrame:
+    """
+    Computes the play statistics of every song at once from the long play table.
+
+    The statistics are measured up to as_of, by default the latest session in the table, so they
+    answer "what haven't we played in a while" relative to the last Tuesday rather than to today.
+
+    Parameters:
+        plays (pd.DataFrame): One row per play with 'song_id' and 'play_date' columns.
+        as_of (pd.Timestamp, optional): End of the rolling windows and reference for days_since_played.
+        rolling_weeks (list, optional): Window lengths in weeks, ROLLING_WEEKS by default.
+
+    Returns:
+        pd.DataFrame: One row per played song id (the index) with 'last_played', 'days_since_played',
+                      'plays_<n>w' for each window and 'median_gap_days' (missing for songs played once).
+    """
+    rolling_weeks = rolling_weeks or ROLLING_WEEKS
+    plays = plays.dropna(subset=['play_date']).sort_values(['song_id', 'play_date'], kind='stable')
+    song_ids = plays['song_id'].to_numpy(dtype=np.int64)
+    dates = pd.to_datetime(plays['play_date']).to_numpy(dtype='datetime64[ns]')
+    as_of = dates.max() if as_of is None and len(dates) else pd.Timestamp(as_of).to_datetime64()
+
+    # Sorted by song then date, the last row of each song is its latest play
+    played_ids, first_rows, play_counts = np.unique(song_ids, return_index=True, return_counts=True)
+    last_played = dates[first_rows + play_counts - 1]
+    stats = pd.DataFrame({'last_played': last_played,
+                          'days_since_played': (as_of - last_played) / np.timedelta64(1, 'D')},
+                         index=pd.Index(played_ids, name='song_id'))
+
+    # Every window is one comparison over all plays and one count per song
+    song_positions = np.repeat(np.arange(len(played_ids)), play_counts)
+    for weeks in rolling_weeks:
+        in_window = (dates > as_of - np.timedelta64(7 * weeks, 'D')) & (dates <= as_of)
+        stats[f"plays_{weeks}w"] = np.bincount(song_positions[in_window], minlength=len(played_ids))
+
+    # Gaps between consecutive plays of the same song, the first play of a song has none
+    same_song = song_ids[1:] == song_ids[:-1]
+    gaps = pd.Series((dates[1:] - dates[:-1])[same_song] / np.timedelta64(1, 'D'))
+    stats['median_gap_days'] = gaps.groupby(song_ids[1:][same_song]).median().reindex(played_ids).to_numpy()
+    return stats
+
+
+def add_play_stats(songs: pd.DataFrame, plays: pd.DataFrame, as_of: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+    """
+    Adds the play statistics as song-level columns of the song table, so they can be shown, sorted
+    and range-filtered like any other column. Songs that were never played get no last play and no
+    gaps, and zero plays in every window.
+
+    Parameters:
+        songs (pd.DataFrame): The prepared song table with a 'song_id' column.
+        plays (pd.DataFrame): One row per play with 'song_id' and 'play_date' columns.
+        as_of (pd.Timestamp, optional): See compute_play_stats.
+
+    Returns:
+        pd.DataFrame: The song table with the PLAY_STAT_COLUMNS added.
+    """
+    stats = compute_play_stats(plays, as_of).reindex(songs['song_id'].to_numpy())
+    songs = songs.copy()
+    for column in stats.columns:
+        values = stats[column].to_numpy()
+        if column.startswith('plays_'):
+            values = np.nan_to_num(values, nan=0).astype(np.int64)
+        songs[column] = values
+    return songs
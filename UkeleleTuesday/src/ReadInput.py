@@ -1,9 +1,11 @@
 # ReadInput.py
 
+import numpy as np
 import pandas as pd
 from pandas import read_csv
 from pandas.errors import EmptyDataError
-from typing import List
+from typing import List, Optional
+from TermMatching import normalize_multi_value_columns
 
 
 # Function to clean the data according to specified points
@@ -24,6 +26,116 @@ def standardize_columns(df: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
     return df
 
 
+# Matches 'HH:MM:SS' and 'MM:SS' durations
+DURATION_PATTERN = r'^\s*(?:(\d+):)?(\d{1,2}):(\d{1,2})\s*$'
+
+
+def parse_duration_seconds(durations: pd.Series) -> pd.Series:
+    """
+    Converts 'HH:MM:SS' or 'MM:SS' durations to total seconds.
+
+    Each distinct duration string is parsed once with a vectorized regex and the result is
+    mapped back onto the rows. Malformed or missing values become NaN.
+
+    Parameters:
+        durations (pd.Series): The duration strings.
+
+    Returns:
+        pd.Series: The durations in seconds as floats, aligned with the input.
+    """
+    codes, uniques = pd.factorize(durations)
+    parts = pd.Series(uniques, dtype=object).astype(str).str.extract(DURATION_PATTERN).astype(float)
+    seconds = (parts[0].fillna(0) * 3600 + parts[1] * 60 + parts[2]).to_numpy()
+    # Missing values have code -1, append a NaN so they map to it
+    seconds = np.append(seconds, np.nan)
+    return pd.Series(seconds[codes], index=durations.index, name=durations.name)
+
+
+def convert_duration_to_seconds(duration: str) -> Optional[float]:
+    """
+    Converts a single 'HH:MM:SS' or 'MM:SS' duration to seconds, or None if it is malformed.
+    Use parse_duration_seconds for whole columns.
+    """
+    seconds = parse_duration_seconds(pd.Series([duration], dtype=object)).iloc[0]
+    return None if pd.isna(seconds) else seconds
+
+
+# Low-cardinality columns stored as pandas Categoricals once they are normalized
+CATEGORICAL_COLUMNS = ['language', 'source', 'type', 'gender', 'artist', 'decade']
+
+
+def convert_to_categorical(df: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
+    """
+    Converts the specified columns to the pandas 'category' dtype.
+
+    Each distinct value is stored once and rows only keep a small integer code, which cuts
+    memory and speeds up value_counts, groupby and isin on these columns.
+
+    Parameters:
+        df (pd.DataFrame): The DataFrame to convert.
+        columns (List[str]): List of columns to convert.
+
+    Returns:
+        pd.DataFrame: The DataFrame with categorical columns.
+    """
+    for col in columns:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            # Numeric columns such as 'decade' keep sorted, ordered categories
+            ordered = pd.api.types.is_numeric_dtype(df[col])
+            df[col] = df[col].astype(pd.CategoricalDtype(sorted(df[col].dropna().unique()), ordered=True)
+                                     if ordered else 'category')
+    return df
+
+
+def prepare_song_table(tab_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Computes every song-level derived column of tabdb, so each transformation runs once per
+    song instead of once per play after the play history is joined on.
+
+    Parameters:
+        tab_df (pd.DataFrame): The raw tabdb DataFrame.
+
+    Returns:
+        pd.DataFrame: One row per song with normalized and derived columns.
+    """
+    # Drop personal information columns from tab_df
+    personal_info_columns = ['tabber']
+    tab_df = tab_df.drop(columns=personal_info_columns, errors='ignore')
+
+    # Convert 'year' to numeric and create 'decade' column in tab_df
+    tab_df['year'] = pd.to_numeric(tab_df['year'], errors='coerce')
+    tab_df = tab_df.dropna(subset=['year'])
+    tab_df['year'] = tab_df['year'].astype(int)
+    tab_df['decade'] = (tab_df['year'] // 10) * 10
+
+    # Reset index after dropping rows
+    tab_df = tab_df.reset_index(drop=True)
+
+    # Standardize 'song' and 'artist' names, they are the keys used to join the play history
+    tab_df['song'] = tab_df['song'].str.strip().str.lower()
+    tab_df['artist'] = tab_df['artist'].str.strip().str.lower()
+
+    # Convert 'difficulty' to numeric
+    if 'difficulty' in tab_df.columns:
+        tab_df['difficulty'] = pd.to_numeric(tab_df['difficulty'], errors='coerce')
+
+    # Convert 'duration' from 'HH:MM:SS' or 'MM:SS' to total seconds
+    if 'duration' in tab_df.columns:
+        tab_df['duration_seconds'] = parse_duration_seconds(tab_df['duration'])
+
+    # Ensure 'gender' column exists
+    if 'gender' not in tab_df.columns:
+        tab_df['gender'] = 'Unknown'
+    else:
+        tab_df['gender'] = tab_df['gender'].fillna('Unknown')
+
+    # Multi-value cells such as 'French, English' are stored once, in their canonical 'english,french' form
+    normalize_multi_value_columns(tab_df)
+
+    # Store the low-cardinality columns as categoricals
+    return convert_to_categorical(tab_df, CATEGORICAL_COLUMNS)
+
+
 def handle_missing_values(df: pd.DataFrame) -> pd.DataFrame:
     """
     Handles missing values in specific columns.
@@ -56,6 +168,7 @@ def read_and_clean_files(filepaths: List[str]) -> dict:
             # Apply standardization and missing value handling
             df = standardize_columns(df, ['language', 'source', 'type', 'gender'])
             df = handle_missing_values(df)
+            df = convert_to_categorical(df, CATEGORICAL_COLUMNS)
             data_frames[filepath] = df
         except FileNotFoundError:
             print(f"File '{filepath}' is not found. Please check the specified path for the file.")
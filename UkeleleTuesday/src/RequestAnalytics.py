@@ -0,0 +1,110 @@
+# RequestAnalytics.py
+
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Optional
+from DateParsing import to_dates
+from SongDictionary import normalize_names
+
+# Names the request date column of requestdb is looked up under, first match wins
+REQUEST_DATE_COLUMNS = ['request_date', 'requested', 'date', 'timestamp']
+
+
+def find_request_date_column(request_df: pd.DataFrame) -> Optional[str]:
+    """
+    Returns the column of requestdb holding the request dates, or None if it has none.
+    """
+    columns = {str(col).strip().lower(): col for col in request_df.columns}
+    for name in REQUEST_DATE_COLUMNS:
+        if name in columns:
+            return columns[name]
+    return None
+
+
+def match_requests_to_plays(request_df: pd.DataFrame, plays: pd.DataFrame) -> pd.DataFrame:
+    """
+    Finds the play that fulfilled each request: the first play of the requested song on or after
+    the request date, found for all requests at once with an as-of merge on the song id.
+
+    Requests without a date are matched to the first play of the song, without a time to fulfil.
+
+    Parameters:
+        request_df (pd.DataFrame): requestdb with 'song', 'artist' and 'song_id' columns (see load_requests).
+        plays (pd.DataFrame): One row per play with 'song_id' and 'play_date' columns.
+
+    Returns:
+        pd.DataFrame: One row per request, in requestdb order, with 'song', 'artist', 'song_id',
+                      'request_date', 'fulfilled_date', 'days_to_fulfil' and 'fulfilled'.
+    """
+    date_column = find_request_date_column(request_df)
+    request_dates = (to_dates(request_df[date_column]) if date_column is not None
+                     else pd.Series(pd.NaT, index=request_df.index, dtype='datetime64[ns]'))
+
+    requests = pd.DataFrame({
+        'song': request_df['song'].to_numpy(),
+        'artist': request_df['artist'].to_numpy(),
+        'song_id': request_df['song_id'].to_numpy(dtype=np.int64),
+        'request_date': request_dates.to_numpy(dtype='datetime64[ns]'),
+        'request_row': np.arange(len(request_df)),
+    })
+    # An undated request is fulfilled by any play, so it is matched from the earliest possible date
+    requests['match_date'] = requests['request_date'].fillna(pd.Timestamp.min)
+
+    plays = plays.dropna(subset=['play_date'])
+    plays = pd.DataFrame({'song_id': plays['song_id'].to_numpy(dtype=np.int64),
+                          'match_date': plays['play_date'].to_numpy(dtype='datetime64[ns]')})
+    plays['fulfilled_date'] = plays['match_date']
+
+    # merge_asof needs both sides sorted on the date, 'by' keeps the search within each song
+    matched = pd.merge_asof(requests.sort_values('match_date', kind='stable'),
+                            plays.sort_values('match_date', kind='stable'),
+                            on='match_date', by='song_id', direction='forward')
+    matched = matched.sort_values('request_row').reset_index(drop=True)
+
+    matched['days_to_fulfil'] = (matched['fulfilled_date'] - matched['request_date']) / pd.Timedelta(days=1)
+    matched['fulfilled'] = matched['fulfilled_date'].notna()
+    return matched[['song', 'artist', 'song_id', 'request_date', 'fulfilled_date', 'days_to_fulfil', 'fulfilled']]
+
+
+def build_request_backlog(fulfilment: pd.DataFrame, as_of: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+    """
+    Summarizes the requests that were not fulfilled yet, one row per requested song.
+
+    Parameters:
+        fulfilment (pd.DataFrame): The result of match_requests_to_plays.
+        as_of (pd.Timestamp, optional): Date the waiting time is measured to, by default the latest
+                                        request or play date in the data.
+
+    Returns:
+        pd.DataFrame: 'song', 'artist', 'open_requests', 'oldest_request' and 'days_waiting',
+                      most requested songs first.
+    """
+    if as_of is None:
+        as_of = pd.concat([fulfilment['request_date'], fulfilment['fulfilled_date']]).max()
+
+    open_requests = fulfilment[~fulfilment['fulfilled']]
+    # Songs missing from the dictionary have no id, so open requests are grouped by their normalized names
+    keys = pd.DataFrame({'song': normalize_names(open_requests['song']).to_numpy(),
+                         'artist': normalize_names(open_requests['artist']).to_numpy(),
+                         'request_date': open_requests['request_date'].to_numpy()})
+    backlog = keys.groupby(['song', 'artist'], as_index=False).agg(
+        open_requests=('request_date', 'size'), oldest_request=('request_date', 'min'))
+    backlog['days_waiting'] = (as_of - backlog['oldest_request']) / pd.Timedelta(days=1)
+    return backlog.sort_values(['open_requests', 'oldest_request'], ascending=[False, True],
+                               kind='stable', ignore_index=True)
+
+
+def analyze_requests(request_df: pd.DataFrame, plays: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Joins requestdb to the play history and summarizes how requests are being fulfilled.
+
+    Returns:
+        dict: 'fulfilment' (see match_requests_to_plays), 'backlog' (see build_request_backlog) and
+              'median_days_to_fulfil' over the dated, fulfilled requests.
+    """
+    fulfilment = match_requests_to_plays(request_df, plays)
+    return {
+        'fulfilment': fulfilment,
+        'backlog': build_request_backlog(fulfilment),
+        'median_days_to_fulfil': fulfilment['days_to_fulfil'].median(),
+    }
@@ -0,0 +1,107 @@
+# ResultGrid.py
+
+from tkinter import Frame, Label, Scrollbar, ttk
+import pandas as pd
+
+
+def format_cell(value) -> str:
+    """
+    Formats a single cell for display, missing values are shown as empty cells.
+    """
+    if pd.isna(value):
+        return ""
+    if isinstance(value, pd.Timestamp):
+        return value.strftime('%Y-%m-%d')
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+class ResultGrid(Frame):
+    """
+    Virtualized table for a DataFrame.
+
+    The Treeview only ever holds the rows that are visible. Scrolling moves a window over the
+    DataFrame and formats just that slice, so showing a result takes the same time whether it
+    has ten rows or a hundred thousand.
+    """
+
+    def __init__(self, master, df: pd.DataFrame, visible_rows: int = 15, **kwargs):
+        super().__init__(master, **kwargs)
+        self.df = df
+        self.visible_rows = visible_rows
+        self.start = 0
+        self.sort_column = None
+        self.sort_ascending = True
+
+        columns = [str(col) for col in df.columns]
+        self.tree = ttk.Treeview(self, columns=columns, show="headings", height=visible_rows)
+        for col in columns:
+            self.tree.heading(col, text=col, command=lambda c=col: self.sort_by(c))
+            self.tree.column(col, width=120, stretch=True)
+
+        self.scrollbar = Scrollbar(self, orient="vertical", command=self.on_scroll)
+        self.x_scrollbar = Scrollbar(self, orient="horizontal", command=self.tree.xview)
+        self.tree.configure(xscrollcommand=self.x_scrollbar.set)
+        self.status_label = Label(self, anchor="w")
+
+        self.tree.grid(row=0, column=0, sticky="nsew")
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+        self.x_scrollbar.grid(row=1, column=0, sticky="ew")
+        self.status_label.grid(row=2, column=0, columnspan=2, sticky="w")
+        self.grid_rowconfigure(0, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+
+        # Mouse wheel on Windows/macOS and Linux
+        self.tree.bind("<MouseWheel>", lambda e: self.scroll_rows(-1 if e.delta > 0 else 1))
+        self.tree.bind("<Button-4>", lambda e: self.scroll_rows(-1))
+        self.tree.bind("<Button-5>", lambda e: self.scroll_rows(1))
+
+        self.render()
+
+    def max_start(self) -> int:
+        return max(len(self.df) - self.visible_rows, 0)
+
+    def scroll_rows(self, step: int) -> None:
+        self.start = min(max(self.start + step, 0), self.max_start())
+        self.render()
+
+    def on_scroll(self, action, amount, unit=None) -> None:
+        """
+        Handles the scrollbar callbacks ('moveto' with a fraction, or 'scroll' by units or pages).
+        """
+        if action == "moveto":
+            self.start = min(max(int(float(amount) * len(self.df)), 0), self.max_start())
+            self.render()
+        elif action == "scroll":
+            step = int(amount) * (self.visible_rows if unit == "pages" else 1)
+            self.scroll_rows(step)
+
+    def sort_by(self, column: str) -> None:
+        """
+        Sorts the whole result by a column, clicking the same heading again reverses the order.
+        """
+        if self.sort_column == column:
+            self.sort_ascending = not self.sort_ascending
+        else:
+            self.sort_column, self.sort_ascending = column, True
+        self.df = self.df.sort_values(by=column, ascending=self.sort_ascending, kind="stable")
+        self.start = 0
+        self.render()
+
+    def render(self) -> None:
+        """
+        Formats and shows only the visible slice of the DataFrame.
+        """
+        self.tree.delete(*self.tree.get_children())
+        end = min(self.start + self.visible_rows, len(self.df))
+        for row in self.df.iloc[self.start:end].itertuples(index=False, name=None):
+            self.tree.insert("", "end", values=[format_cell(value) for value in row])
+
+        total = len(self.df)
+        if total:
+            self.scrollbar.set(self.start / total, end / total)
+            self.status_label.config(text=f"Rows {self.start + 1}-{end} of {total}")
+        else:
+            self.scrollbar.set(0, 1)
+            self.status_label.config(text="No rows")
@@ -0,0 +1,102 @@
+# SongDictionary.py
+
+import hashlib
+import os
+import numpy as np
+import pandas as pd
+from typing import Optional
+
+DICTIONARY_NAME = "song_dictionary.csv"
+
+
+def normalize_names(names: pd.Series) -> pd.Series:
+    """
+    Normalizes song or artist names (stripped and lowercased), missing names become empty strings.
+    """
+    return names.astype(object).fillna('').astype(str).str.strip().str.lower()
+
+
+class SongDictionary:
+    """
+    Assigns stable integer song ids to normalized (song, artist) pairs.
+
+    The ids are saved next to the other cached data, so a song keeps its id across runs and
+    tabdb, playdb and requestdb can be joined on an int64 key instead of two text columns.
+    """
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        self.path = os.path.join(cache_dir, DICTIONARY_NAME)
+        self.changed = False
+        try:
+            self.table = pd.read_csv(self.path, dtype={'song': str, 'artist': str, 'song_id': np.int64},
+                                     keep_default_na=False)
+        except (OSError, pd.errors.EmptyDataError):
+            self.table = pd.DataFrame({'song': pd.Series(dtype=object), 'artist': pd.Series(dtype=object),
+                                       'song_id': pd.Series(dtype=np.int64)})
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    def _match(self, songs: pd.Series, artists: pd.Series) -> pd.DataFrame:
+        keys = pd.DataFrame({'song': normalize_names(songs).to_numpy(),
+                             'artist': normalize_names(artists).to_numpy()})
+        return keys.merge(self.table, on=['song', 'artist'], how='left')
+
+    def lookup_ids(self, songs: pd.Series, artists: pd.Series) -> np.ndarray:
+        """
+        Returns the song id of each (song, artist) pair, or -1 for pairs that are not in the dictionary.
+        """
+        matched = self._match(songs, artists)
+        return matched['song_id'].fillna(-1).to_numpy(dtype=np.int64)
+
+    def assign_ids(self, songs: pd.Series, artists: pd.Series) -> np.ndarray:
+        """
+        Returns the song id of each (song, artist) pair, adding new ids for pairs seen for the first time.
+
+        Parameters:
+            songs (pd.Series): Song names.
+            artists (pd.Series): Artist names, aligned with songs.
+
+        Returns:
+            np.ndarray: The int64 song ids, aligned with the input.
+        """
+        matched = self._match(songs, artists)
+        missing = matched['song_id'].isna()
+        if missing.any():
+            new_keys = matched.loc[missing, ['song', 'artist']].drop_duplicates()
+            next_id = int(self.table['song_id'].max()) + 1 if len(self.table) else 0
+            new_keys['song_id'] = np.arange(next_id, next_id + len(new_keys), dtype=np.int64)
+            self.table = pd.concat([self.table, new_keys], ignore_index=True)
+            self.changed = True
+            matched = matched[['song', 'artist']].merge(self.table, on=['song', 'artist'], how='left')
+        return matched['song_id'].to_numpy(dtype=np.int64)
+
+    def fingerprint(self, rows: Optional[int] = None) -> dict:
+        """
+        Returns the number of ids and a hash of the (song, artist) -> id pairs, of the first rows ids only if given.
+
+        Ids are only ever appended, so data keyed by this dictionary is still valid as long as the
+        fingerprint of its first rows is the one stored with the data.
+        """
+        table = self.table.iloc[:len(self.table) if rows is None else rows]
+        pairs = (table['song'].astype(str) + "\x1f" + table['artist'].astype(str) + "\x1f"
+                 + table['song_id'].astype(str))
+        return {'rows': len(table), 'sha256': hashlib.sha256("\n".join(pairs).encode()).hexdigest()}
+
+    def save(self) -> bool:
+        """
+        Writes the dictionary to disk if new ids were assigned. If the cache directory cannot be
+        written the ids stay in memory for this run only.
+
+        Returns:
+            bool: False if new ids could not be written.
+        """
+        if self.changed:
+            try:
+                self.table.to_csv(self.path, index=False)
+            except OSError as e:
+                print(f"Warning: Could not save song ids in {self.cache_dir}: {e}")
+                return False
+            self.changed = False
+        return True
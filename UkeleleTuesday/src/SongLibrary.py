@@ -0,0 +1,40 @@
+# SongLibrary.py
+"""
+The one place the GUIs, scripts and reports import their data handling from:
+
+    load       load_dataset (tabdb + playdb + requestdb, cached) or load_song_table (tabdb only),
+               build_playdb_totals for the play counts of a playdb read whole
+    normalize  prepare_song_table, parse_duration_seconds, parse_yyyymmdd and
+               normalize_multi_value_columns for comma-separated fields such as language,
+               add_play_stats for last play, rolling play counts and gaps as song columns
+    filter     get_user_filters (planned, index-backed), apply_filter for a single column and
+               TermSets for exact/all/any matching of comma-separated terms
+    aggregate  prepare_chart_data, then render_chart or plot_filtered_data to draw it, and
+               analyze_requests for request fulfilment times and the open request backlog
+
+Scripts outside src/ add this directory to sys.path before importing. Benchmark.py times the
+whole chain so changes to any step can be measured.
+"""
+
+from ChartData import CHART_TYPES, MAX_SCATTER_POINTS, infer_chart_type, prepare_chart_data
+from Charts import plot_filtered_data, render_chart
+from DataLoader import HIDDEN_COLUMNS, load_dataset, load_song_table
+from DateParsing import parse_yyyymmdd, to_dates
+from PlayHistory import PlayTotals, build_playdb_totals
+from PlayStats import PLAY_STAT_COLUMNS, ROLLING_WEEKS, add_play_stats, compute_play_stats
+from FilterIndex import FilterIndex
+from Multifilter import apply_filter, compile_filter_plan, execute_filter_plan, get_user_filters, parse_filter_input
+from ReadInput import convert_duration_to_seconds, parse_duration_seconds, prepare_song_table
+from RequestAnalytics import analyze_requests, build_request_backlog, match_requests_to_plays
+from TermMatching import MATCH_MODES, MULTI_VALUE_COLUMNS, TermSets, normalize_multi_value_columns
+
+__all__ = [
+    'CHART_TYPES', 'MAX_SCATTER_POINTS', 'HIDDEN_COLUMNS', 'FilterIndex',
+    'load_dataset', 'load_song_table', 'PlayTotals', 'build_playdb_totals',
+    'PLAY_STAT_COLUMNS', 'ROLLING_WEEKS', 'compute_play_stats', 'add_play_stats',
+    'prepare_song_table', 'parse_duration_seconds', 'convert_duration_to_seconds', 'parse_yyyymmdd', 'to_dates',
+    'apply_filter', 'parse_filter_input', 'get_user_filters', 'compile_filter_plan', 'execute_filter_plan',
+    'MATCH_MODES', 'MULTI_VALUE_COLUMNS', 'TermSets', 'normalize_multi_value_columns',
+    'infer_chart_type', 'prepare_chart_data', 'render_chart', 'plot_filtered_data',
+    'analyze_requests', 'match_requests_to_plays', 'build_request_backlog',
+]
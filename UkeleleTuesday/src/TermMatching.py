@@ -0,0 +1,129 @@
+# TermMatching.py
+
+import numpy as np
+import pandas as pd
+from typing import Dict, FrozenSet, Iterable, List, Optional
+from FilterIndex import group_positions
+
+# Columns holding comma-separated values, e.g. 'english,french' for a bilingual song
+MULTI_VALUE_COLUMNS = ['language']
+# exact: the cell holds exactly the selected terms, all: at least all of them, any: at least one of them
+MATCH_MODES = ['exact', 'all', 'any']
+
+
+def split_terms(value: str) -> FrozenSet[str]:
+    """
+    Splits a comma-separated multi-value cell such as 'English, French' into its lowercased terms.
+    """
+    return frozenset(term.strip() for term in str(value).lower().split(",") if term.strip())
+
+
+class TermSets:
+    """
+    A multi-value column tokenized once for exact/all/any term queries.
+
+    Each distinct cell is split into a frozenset of terms and turned into a bitmask over the
+    column's vocabulary, rows only keep the code of their cell. A query compares one bitmask
+    per distinct cell and maps the answers back to the rows, so its cost no longer grows with
+    the vocabulary times the number of rows.
+
+    The canonical form of a cell is its sorted tuple of terms, and the term -> row positions
+    posting lists give per-term counts without splitting and exploding the column again.
+    """
+
+    def __init__(self, series: pd.Series):
+        self.labels = series.index
+        self.codes, uniques = pd.factorize(series, use_na_sentinel=True)
+        self.term_sets = [split_terms(value) for value in uniques]
+        self.canonical = [tuple(sorted(terms)) for terms in self.term_sets]
+        self.vocabulary = sorted(set().union(*self.term_sets))
+        self.bits = {term: 1 << position for position, term in enumerate(self.vocabulary)}
+        self.bitmasks = [self._bitmask(terms) for terms in self.term_sets]
+        self.postings = self._build_postings()
+
+    def _build_postings(self) -> Dict[str, np.ndarray]:
+        cell_positions = group_positions(self.codes, len(self.term_sets))
+        cell_rows: Dict[str, List[np.ndarray]] = {term: [] for term in self.vocabulary}
+        for code, terms in enumerate(self.term_sets):
+            for term in terms:
+                cell_rows[term].append(cell_positions[code])
+        return {term: np.sort(np.concatenate(rows)) for term, rows in cell_rows.items()}
+
+    def canonical_values(self) -> pd.Series:
+        """
+        Returns the column with every cell rewritten as its sorted terms joined by commas.
+        """
+        values = np.array([",".join(terms) if terms else np.nan for terms in self.canonical] + [np.nan], dtype=object)
+        return pd.Series(values[self.codes], index=self.labels)
+
+    def term_counts(self, exclude: Iterable[str] = ()) -> pd.Series:
+        """
+        Returns the number of rows holding each term, most frequent first.
+        """
+        excluded = {term.lower() for term in exclude}
+        counts = pd.Series({term: len(rows) for term, rows in self.postings.items() if term not in excluded}, dtype=int)
+        return counts.sort_values(ascending=False, kind='stable')
+
+    def rows(self, term: str) -> np.ndarray:
+        """
+        Returns the sorted row positions whose cell holds the term.
+        """
+        return self.postings.get(term.strip().lower(), np.array([], dtype=np.int32))
+
+    def _bitmask(self, terms: Iterable[str]) -> int:
+        mask = 0
+        for term in terms:
+            mask |= self.bits.get(term, 0)
+        return mask
+
+    def mask(self, terms: Iterable[str], mode: str = 'exact') -> np.ndarray:
+        """
+        Returns a boolean row mask for the rows whose terms match the selected terms.
+
+        Parameters:
+            terms (iterable): The selected terms, compared case-insensitively.
+            mode (str): One of MATCH_MODES.
+
+        Returns:
+            np.ndarray: One boolean per row, empty cells never match.
+
+        Raises:
+            ValueError: If the mode is not one of MATCH_MODES.
+        """
+        if mode not in MATCH_MODES:
+            raise ValueError(f"Unknown match mode '{mode}', expected one of {MATCH_MODES}.")
+        selected = frozenset(term.strip().lower() for term in terms if term and term.strip())
+        query = self._bitmask(selected)
+        # A term missing from the vocabulary can never be present, so 'exact' and 'all' fail outright
+        known = len(selected) == bin(query).count("1")
+
+        if mode == 'exact':
+            matches = [known and cell == query for cell in self.bitmasks]
+        elif mode == 'all':
+            matches = [known and cell & query == query for cell in self.bitmasks]
+        else:
+            matches = [cell & query != 0 for cell in self.bitmasks]
+
+        matches = np.array(matches + [False], dtype=bool)
+        # Code -1 (a missing cell) picks the trailing False
+        return matches[self.codes]
+
+
+def normalize_multi_value_columns(df: pd.DataFrame, columns: Optional[List[str]] = None) -> Dict[str, TermSets]:
+    """
+    Rewrites the multi-value columns of the DataFrame in place into their canonical form
+    (lowercased terms, sorted, joined by commas) and returns their TermSets for later queries.
+
+    Parameters:
+        df (pd.DataFrame): The song table.
+        columns (list, optional): Columns to normalize, MULTI_VALUE_COLUMNS by default.
+
+    Returns:
+        dict: Column name -> TermSets of that column.
+    """
+    term_sets = {}
+    for column in columns or MULTI_VALUE_COLUMNS:
+        if column in df.columns:
+            term_sets[column] = TermSets(df[column])
+            df[column] = term_sets[column].canonical_values()
+    return term_sets
@@ -1,340 +1,90 @@
 from tkinter import *
-from tkinter import filedialog, messagebox, simpledialog
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-from functools import reduce
-
-
-# Function to convert 'HH:MM:SS' to total seconds
-def convert_duration_to_seconds(duration_str):
-    try:
-        h, m, s = duration_str.split(':')
-        return int(h) * 3600 + int(m) * 60 + int(s)
-    except Exception:
-        return None  # Return None if conversion fails
-
-# Function definitions for filtering and plotting
-def apply_filter(df: pd.DataFrame, column: str, value: any) -> pd.DataFrame:
-    print(f"Applying filter for column '{column}' with value(s): {value}")
-
-    if df.empty:
-        print("The DataFrame is empty. Skipping filtering.")
-        return df
-
-    if column not in df.columns:
-        print(f"Warning: Column '{column}' does not exist in the DataFrame. Skipping this filter.")
-        return df
-
-    if pd.api.types.is_numeric_dtype(df[column]):
-        try:
-            if isinstance(value, tuple) and len(value) == 2:
-                min_val, max_val = value
-                return df[(df[column] >= min_val) & (df[column] <= max_val)]
-            if isinstance(value, list):
-                value = [float(v) for v in value]
-                return df[df[column].isin(value)]
-            return df[df[column] == float(value)]
-        except (ValueError, TypeError):
-            print(f"Warning: Could not apply numeric filter on column '{column}' with value '{value}'.")
-            return df
-
-    if pd.api.types.is_string_dtype(df[column]):
-        if isinstance(value, list):
-            value = [str(v).strip().lower() for v in value]
-            print(f"Normalized string filter values for column '{column}': {value}")
-            return df[df[column].str.strip().str.lower().isin(value)]
-        else:
-            value = str(value).strip().lower()
-            return df[df[column].str.strip().str.lower() == value]
-
-    print(f"Warning: Unsupported column type for '{column}'. Skipping this filter.")
-    return df
-
-def parse_filter_input(column: str, filter_value: any, column_type: any) -> any:
-    try:
-        if isinstance(filter_value, list):
-            parsed_values = []
-            for value in filter_value:
-                if pd.api.types.is_numeric_dtype(column_type):
-                    parsed_values.append(float(value.strip()))
-                elif pd.api.types.is_string_dtype(column_type):
-                    parsed_values.append(value.strip())
-            return parsed_values
-
-        if pd.api.types.is_numeric_dtype(column_type):
-            return float(filter_value.strip())
-        elif pd.api.types.is_string_dtype(column_type):
-            return filter_value.strip()
-
-        return filter_value
-    except (ValueError, AttributeError):
-        print(f"Warning: Could not parse '{filter_value}' for column '{column}' with type '{column_type}'.")
-        return None
-
-def get_user_filters(df: pd.DataFrame, filters: dict) -> pd.DataFrame:
-    if df.empty:
-        print("The DataFrame is empty. No filters can be applied.")
-        return df
-
-    parsed_filters = {}
-
-    for column, filter_values in filters.items():
-        column_type = df[column].dtype
-        parsed_filter = parse_filter_input(column, filter_values, column_type)
-
-        if parsed_filter is None:
-            print(f"Skipping filter for column '{column}' due to invalid or empty value.")
-            continue
-
-        parsed_filters[column] = parsed_filter
-
-    if not parsed_filters:
-        print("No valid filters provided.")
-        return df
-
-    filtered_df = reduce(lambda df, kv: apply_filter(df, kv[0], kv[1]), parsed_filters.items(), df)
-
-    if filtered_df.empty:
-        print("No results matched the filters.")
-        return filtered_df
-
-    return filtered_df
-
-def plot_filtered_data(df: pd.DataFrame, x_column: str, y_column: str, chart_type: str) -> None:
-    # Check if the X-axis column exists
-    if x_column not in df.columns:
-        messagebox.showerror("Error", f"Column '{x_column}' not found in filtered data.")
-        return
-
-    # Handle Histogram
-    if chart_type == 'Histogram':
-        if pd.api.types.is_numeric_dtype(df[x_column]):
-            plt.figure(figsize=(10, 6))
-            sns.histplot(df[x_column], bins=10, kde=True)
-            plt.title(f"Histogram of {x_column.capitalize()}")
-            plt.xlabel(x_column.capitalize())
-            plt.ylabel('Frequency')
-            plt.tight_layout()
-            plt.show()
-            return
-        else:
-            messagebox.showinfo("Plotting Error", f"Cannot plot histogram for non-numeric column '{x_column}'.")
-            return
-
-    # Handle Cumulative Line Chart
-    elif chart_type == 'Cumulative Line Chart':
-        if x_column not in df.columns:
-            messagebox.showerror("Error", f"The data does not contain '{x_column}' column.")
-            return
-        if not pd.api.types.is_datetime64_any_dtype(df[x_column]):
-            try:
-                df[x_column] = pd.to_datetime(df[x_column], errors='coerce')
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to convert '{x_column}' to datetime: {e}")
-                return
-        df = df.dropna(subset=[x_column])
-        df = df.sort_values(x_column)
-
-        # Group by date and count number of songs played
-        df_grouped = df.groupby(x_column).size().reset_index(name='song_count')
-        df_grouped['cumulative_count'] = df_grouped['song_count'].cumsum()
-
-        plt.figure(figsize=(10, 6))
-        plt.plot(df_grouped[x_column], df_grouped['cumulative_count'], marker='o')
-        plt.title('Cumulative Number of Songs Played Over Time')
-        plt.xlabel('Date')
-        plt.ylabel('Cumulative Number of Songs')
-        plt.xticks(rotation=45)
-        plt.tight_layout()
-        plt.show()
-        return
-
-    # Handle Pie Chart
-    elif chart_type == 'Pie Chart':
-        if x_column in df.columns:
-            counts = df[x_column].value_counts()
-            plt.figure(figsize=(8, 8))
-            counts.plot(kind='pie', autopct='%1.1f%%', startangle=90)
-            plt.title(f"Distribution of Songs by {x_column.capitalize()}")
-            plt.ylabel('')
-            plt.tight_layout()
-            plt.show()
-            return
-        else:
-            messagebox.showerror("Error", f"Column '{x_column}' not found in data.")
-            return
-
-    # Check if the Y-axis column exists
-    if y_column not in df.columns:
-        messagebox.showerror("Error", f"Column '{y_column}' not found in filtered data.")
-        return
-
-    # Both columns are numeric (Scatter Plot)
-    if chart_type == 'Scatter Plot':
-        if pd.api.types.is_numeric_dtype(df[x_column]) and pd.api.types.is_numeric_dtype(df[y_column]):
-            plt.figure(figsize=(10, 6))
-            sns.scatterplot(x=x_column, y=y_column, data=df)
-            plt.title(f"{y_column.capitalize()} vs {x_column.capitalize()}")
-            plt.xlabel(x_column.capitalize())
-            plt.ylabel(y_column.capitalize())
-            plt.tight_layout()
-            plt.show()
-            return
-        else:
-            messagebox.showinfo("Plotting Error", "Both X and Y columns must be numeric for a scatter plot.")
-            return
+from tkinter import filedialog, messagebox, simpledialog, ttk
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.figure import Figure
+from SongLibrary import (CHART_TYPES, HIDDEN_COLUMNS, MAX_SCATTER_POINTS, get_user_filters, load_dataset,
+                         prepare_chart_data, render_chart)
+from ResultGrid import ResultGrid
+from CheckList import VirtualCheckList
+from BackgroundTasks import TaskRunner
+from ColumnMetadata import ColumnMetadata
 
-    # X is categorical, Y is numeric (Bar Plot)
-    elif chart_type == 'Bar Plot':
-        if pd.api.types.is_numeric_dtype(df[y_column]) and (
-            pd.api.types.is_categorical_dtype(df[x_column]) or pd.api.types.is_object_dtype(df[x_column])
-        ):
-            # Ask user for aggregation method
-            aggregation = simpledialog.askstring(
-                "Aggregation", f"Choose aggregation for {y_column} (sum or average):", initialvalue="average"
-            )
-            if aggregation and aggregation.lower() == 'sum':
-                df_grouped = df.groupby(x_column)[y_column].sum().reset_index()
-                agg_label = f"Total {y_column.capitalize()}"
-            else:
-                df_grouped = df.groupby(x_column)[y_column].mean().reset_index()
-                agg_label = f"Average {y_column.capitalize()}"
-
-            plt.figure(figsize=(10, 6))
-            sns.barplot(x=x_column, y=y_column, data=df_grouped, ci=None)
-            plt.title(f"{agg_label} by {x_column.capitalize()}")
-            plt.xlabel(x_column.capitalize())
-            plt.ylabel(agg_label)
-            plt.xticks(rotation=45, ha='right')
-            plt.tight_layout()
-            plt.show()
-            return
-        else:
-            messagebox.showinfo("Plotting Error", "X must be categorical and Y must be numeric for a bar plot.")
-            return
-
-    # X is numeric, Y is categorical (Box Plot)
-    elif chart_type == 'Box Plot':
-        if pd.api.types.is_numeric_dtype(df[x_column]) and (
-            pd.api.types.is_categorical_dtype(df[y_column]) or pd.api.types.is_object_dtype(df[y_column])
-        ):
-            plt.figure(figsize=(10, 6))
-            sns.boxplot(x=y_column, y=x_column, data=df)
-            plt.title(f"Distribution of {x_column.capitalize()} by {y_column.capitalize()}")
-            plt.xlabel(y_column.capitalize())
-            plt.ylabel(x_column.capitalize())
-            plt.xticks(rotation=45, ha='right')
-            plt.tight_layout()
-            plt.show()
-            return
-        else:
-            messagebox.showinfo("Plotting Error", "X must be numeric and Y must be categorical for a box plot.")
-            return
-
-    else:
-        messagebox.showinfo("Plotting Error", "Could not determine appropriate plot for selected data.")
-        return
 
 # GUI Classes
 class DataFilterGUI:
     def __init__(self, master, file_paths):
         self.master = master
         self.file_paths = file_paths
-        self.tab_df = self.load_data()
-        self.play_df = self.load_data()
+        self.tab_df = None
         self.selected_filters = {}
+        self.active_filters = {}
 
         # Initialize sort order
         self.sort_ascending = True
         self.current_column = None
 
-        # Create GUI elements for filtering
-        self.create_widgets()
-
-    def load_data(self):
-        try:
-            # Load the CSV files
-            tab_df = pd.read_csv(self.file_paths['Tabdb']['path'])
-            play_df = pd.read_csv(self.file_paths['Playdb']['path'])
-            request_df = pd.read_csv(self.file_paths['Requestdb']['path'])
-
-            # Drop personal information columns from tab_df
-            personal_info_columns = ['tabber']
-            tab_df = tab_df.drop(columns=personal_info_columns, errors='ignore')
-
-            # Convert 'year' to numeric and create 'decade' column in tab_df
-            tab_df['year'] = pd.to_numeric(tab_df['year'], errors='coerce')
-            tab_df = tab_df.dropna(subset=['year'])
-            tab_df['year'] = tab_df['year'].astype(int)
-            tab_df['decade'] = (tab_df['year'] // 10) * 10
-
-            # Reset index after dropping rows
-            tab_df.reset_index(drop=True, inplace=True)
-
-            # Identify the date columns in play_df
-            date_columns = [col for col in play_df.columns if col.startswith('20')]  # Since the dates start with '20'
-
-            # Check if 'song' and 'artist' columns exist in play_df
-            if not all(col in play_df.columns for col in ['song', 'artist']):
-                messagebox.showerror("Error", "The 'playdb' file must contain 'song' and 'artist' columns.")
-                self.master.destroy()
-                return None
-
-            # Reshape play_df using melt to get 'song', 'artist', 'play_date', 'played' columns
-            play_df_long = play_df.melt(
-                id_vars=['song', 'artist'],
-                value_vars=date_columns,
-                var_name='play_date',
-                value_name='played'
-            )
-
-            # Filter out rows where 'played' is NaN or 0 (assuming 1 indicates played)
-            play_df_long = play_df_long[play_df_long['played'] == 1]
-
-            # Convert 'play_date' to datetime format
-            play_df_long['play_date'] = pd.to_datetime(play_df_long['play_date'], format='%Y%m%d', errors='coerce')
+        # Status bar with a progress indicator for the work running in the background
+        self.status_frame = Frame(self.master)
+        self.status_frame.pack(side="bottom", fill="x")
+        self.status_label = Label(self.status_frame, anchor="w")
+        self.status_label.pack(side="left", padx=10)
+        self.progress = ttk.Progressbar(self.status_frame, mode="indeterminate", length=150)
+
+        # Charts are drawn into one figure embedded in the display frame, reused for every chart
+        self.chart_figure = Figure(figsize=(8, 5))
+        self.chart_canvas = None
+
+        # Loading, filtering and chart preparation run off the Tk main loop
+        self.tasks = TaskRunner(self.master, on_status=self.show_status)
+        self.master.protocol("WM_DELETE_WINDOW", self.close)
+
+        # The filter widgets are created once the data has been loaded
+        self.load_data()
+
+    def show_status(self, message, busy):
+        self.status_label.config(text=message)
+        if busy:
+            self.progress.pack(side="right", padx=10)
+            self.progress.start(10)
+        else:
+            self.progress.stop()
+            self.progress.pack_forget()
 
-            # Remove rows with invalid dates
-            play_df_long = play_df_long.dropna(subset=['play_date'])
+    def close(self):
+        self.tasks.shutdown()
+        self.master.destroy()
 
-            # Standardize 'song' and 'artist' names in both DataFrames
-            for df in [tab_df, play_df_long]:
-                df['song'] = df['song'].str.strip().str.lower()
-                df['artist'] = df['artist'].str.strip().str.lower()
+    def load_data(self):
+        self.tasks.submit(
+            'load', self.prepare_data,
+            message="Loading data...",
+            on_done=self.on_data_loaded,
+            on_error=self.on_load_error
+        )
 
-            # Merge tab_df with play_df_long on 'song' and 'artist'
-            merged_df = pd.merge(
-                tab_df,
-                play_df_long[['song', 'artist', 'play_date']],
-                on=['song', 'artist'],
-                how='left'
-            )
+    def on_data_loaded(self, result):
+        # Store the merged DataFrame in self.tab_df along with its filter index, column metadata,
+        # the per-Tuesday play counts and the requests
+        self.tab_df, self.filter_index, self.column_metadata, self.session_counts, self.request_df = result
 
-            # Convert 'difficulty' to numeric in merged_df
-            if 'difficulty' in merged_df.columns:
-                merged_df['difficulty'] = pd.to_numeric(merged_df['difficulty'], errors='coerce')
+        # Create GUI elements for filtering
+        self.create_widgets()
 
-            # Convert 'duration' from 'HH:MM:SS' to total seconds
-            if 'duration' in merged_df.columns:
-                merged_df['duration_seconds'] = merged_df['duration'].apply(convert_duration_to_seconds)
-                # Optionally, drop the original 'duration' column
-                # merged_df = merged_df.drop(columns=['duration'])
+    def on_load_error(self, e):
+        messagebox.showerror("Error", f"Failed to load data: {e}")
+        self.master.destroy()
 
-            # Ensure 'gender' column exists in merged_df
-            if 'gender' not in merged_df.columns:
-                merged_df['gender'] = 'Unknown'
-            else:
-                merged_df['gender'] = merged_df['gender'].fillna('Unknown')
+    def prepare_data(self):
+        """
+        Loads and prepares all data. Runs on a worker thread, so it must not use Tk.
+        """
+        dataset = load_dataset(*[self.file_paths[name]['path'] for name in ['Tabdb', 'Playdb', 'Requestdb']])
+        merged_df = dataset['merged']
 
-            # Store the merged DataFrame in self.tab_df
-            self.tab_df = merged_df
+        # Describe every column for the filter screen
+        column_metadata = ColumnMetadata(merged_df, [col for col in merged_df.columns if col not in HIDDEN_COLUMNS])
 
-            return self.tab_df
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to load data: {e}")
-            self.master.destroy()
-            return None
+        return merged_df, dataset['filter_index'], column_metadata, dataset['session_counts'], dataset['requests']
 
     def create_widgets(self):
         # Adjusted to use grid for buttons
@@ -345,7 +95,7 @@ class DataFilterGUI:
         self.display_frame.pack(fill="both", expand=True, padx=20, pady=10)
 
         # Create buttons for each column using grid
-        columns = self.tab_df.columns.tolist()
+        columns = [col for col in self.tab_df.columns if col not in HIDDEN_COLUMNS]
         max_columns_in_row = 5  # Adjust as needed
         for idx, column_name in enumerate(columns):
             row = idx // max_columns_in_row
@@ -409,10 +159,9 @@ class DataFilterGUI:
             return
 
         # Handle numerical columns differently
-        if pd.api.types.is_numeric_dtype(self.tab_df[column_name]):
+        if self.column_metadata.is_numeric(column_name):
             # For numerical columns, provide options to filter by range
-            min_value = self.tab_df[column_name].min()
-            max_value = self.tab_df[column_name].max()
+            min_value, max_value = self.column_metadata.value_range(column_name)
 
             label = Label(
                 self.display_frame,
@@ -440,11 +189,10 @@ class DataFilterGUI:
             self.selected_filters[column_name] = {'min': min_var, 'max': max_var}
         else:
             # Existing code for categorical columns
-            unique_values = self.tab_df[column_name].dropna().unique()
+            # Unique values are sorted once per load, in both orders
+            unique_values = self.column_metadata.unique_values(column_name, self.sort_ascending)
             if len(unique_values) == 0:
                 unique_values = ["(No Data)"]
-            else:
-                unique_values = sorted(unique_values, key=lambda x: str(x), reverse=not self.sort_ascending)
 
             # Create a label to display the column name
             label = Label(
@@ -455,48 +203,20 @@ class DataFilterGUI:
             )
             label.pack(pady=10)
 
-            # Create a canvas with a scrollbar for the checkboxes
-            canvas = Canvas(self.display_frame, highlightthickness=0)
-            canvas.pack(side="left", fill="both", expand=True)
+            # Keep what was already ticked for this column when it is reopened
+            previous = self.selected_filters.get(column_name)
+            selected = previous.selected_values() if isinstance(previous, VirtualCheckList) else []
 
-            scrollbar = Scrollbar(
-                self.display_frame, orient="vertical", command=canvas.yview
-            )
-            scrollbar.pack(side="right", fill="y")
-
-            canvas.configure(yscrollcommand=scrollbar.set)
-            canvas.bind(
-                "<Configure>",
-                lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
-            )
+            # Only the visible checkboxes are created, with a search box to jump through long lists
+            check_list = VirtualCheckList(self.display_frame, unique_values, selected=selected, visible_rows=15)
+            check_list.pack(fill="both", expand=True)
 
-            # Frame inside the canvas to hold checkboxes
-            checkbox_frame = Frame(canvas)
-            canvas.create_window((0, 0), window=checkbox_frame, anchor="nw")
-
-            # Dictionary to hold checkbox variables for the current column
-            checkbox_vars = {}
-
-            # Dynamically create checkboxes for each unique value
-            for value in unique_values:
-                display_text = str(value) if len(str(value)) <= 50 else str(value)[:47] + "..."
-                var = IntVar()
-                checkbox_vars[display_text] = var
-                checkbox = Checkbutton(
-                    checkbox_frame, text=display_text, variable=var, anchor="w"
-                )
-                checkbox.pack(fill="x", pady=2, padx=10)
-
-            # Store the checkbox variables in the selected_filters dictionary
-            self.selected_filters[column_name] = checkbox_vars
-
-            # Update the display and focus to force rendering
-            checkbox_frame.update_idletasks()
-            canvas.focus_set()
+            # Store the checkbox list in the selected_filters dictionary
+            self.selected_filters[column_name] = check_list
 
             if len(unique_values) == 1 and unique_values[0] == "(No Data)":
                 empty_label = Label(
-                    checkbox_frame,
+                    self.display_frame,
                     text="No data available for this column.",
                     fg="red"
                 )
@@ -517,29 +237,34 @@ class DataFilterGUI:
                     filters[column] = (min_value, max_value)
                     print(f"Column: {column}, Range: {min_value} to {max_value}")
                 else:
-                    # Categorical filter
-                    selected_values = [
-                        value for value, var in filter_vars.items() if var.get() == 1
-                    ]
+                    # Categorical filter, values are passed as text like the user picked them
+                    selected_values = [str(value) for value in filter_vars.selected_values()]
                     if selected_values:
                         filters[column] = selected_values
                     print(f"Column: {column}, Selected Values: {selected_values}")  # Debug print
 
             print("Filters selected by user:", filters)
-
-            # Call get_user_filters with the DataFrame and the filters dictionary
-            filtered_df = get_user_filters(self.tab_df, filters)
-
-            # Display the filtered DataFrame or use it as needed
-            print("Filtered DataFrame:")
-            print(filtered_df)
-
-            # Call display_results to show the filtered data in the GUI
-            self.display_columns_selection(filtered_df)
+            self.active_filters = filters
+
+            # Filter in the background, a newer click supersedes a filter that is still running
+            self.tasks.submit(
+                'filter', get_user_filters, self.tab_df, filters, self.filter_index, self.column_metadata,
+                message="Filtering...",
+                on_done=self.on_filters_applied,
+                on_error=lambda e: messagebox.showerror("Error", f"An error occurred in apply_filters: {e}")
+            )
         except Exception as e:
             messagebox.showerror("Error", f"An error occurred in apply_filters: {e}")
             print(f"An error occurred in apply_filters: {e}")
 
+    def on_filters_applied(self, filtered_df):
+        # Display the filtered DataFrame or use it as needed
+        print("Filtered DataFrame:")
+        print(filtered_df)
+
+        # Call display_results to show the filtered data in the GUI
+        self.display_columns_selection(filtered_df)
+
     def display_columns_selection(self, filtered_df):
         """
         Display a column selection UI for the user to select which columns to include in the output.
@@ -572,7 +297,7 @@ class DataFilterGUI:
         # Create a dictionary to hold checkbox variables for each column
         column_vars = {}
         for column in filtered_df.columns:
-            if column != "tabber":  # Exclude "tabber" column
+            if column not in HIDDEN_COLUMNS:  # Exclude "tabber" and internal key columns
                 var = IntVar()
                 column_vars[column] = var
                 checkbox = Checkbutton(scrollable_frame, text=column, variable=var, anchor="w")
@@ -596,8 +321,8 @@ class DataFilterGUI:
         selected_columns = [col for col, var in column_vars.items() if var.get() == 1]
 
         if not selected_columns:
-            print("No columns selected. Displaying all columns (except 'tabber').")
-            selected_columns = [col for col in filtered_df.columns if col != "tabber"]  # Exclude "tabber" by default
+            print("No columns selected. Displaying all columns (except hidden ones).")
+            selected_columns = [col for col in filtered_df.columns if col not in HIDDEN_COLUMNS]
 
         # Display the filtered DataFrame with selected columns
         filtered_data_display = filtered_df[selected_columns]
@@ -623,13 +348,9 @@ class DataFilterGUI:
                 )
                 no_results_label.pack(pady=10)
             else:
-                # Create a Text widget to show the results
-                result_text = Text(results_frame, height=15, width=80)
-                result_text.pack(pady=10)
-
-                # Insert filtered data into the text widget
-                result_text.insert(END, filtered_df.to_string(index=False))
-                result_text.config(state=DISABLED)  # Disable editing
+                # Show the results in a virtualized table that only formats the visible rows
+                result_grid = ResultGrid(results_frame, filtered_df, visible_rows=15)
+                result_grid.pack(fill="both", expand=True, pady=10)
 
             # Add the Show Graph button here
             self.show_graph_button = Button(
@@ -680,8 +401,7 @@ class DataFilterGUI:
                 text="Select Chart Type:",
                 font=("Arial", 12)
             ).pack(pady=5)
-            chart_type_options = ['Histogram', 'Cumulative Line Chart', 'Pie Chart', 'Scatter Plot', 'Bar Plot', 'Box Plot']
-            chart_type_dropdown = OptionMenu(self.display_frame, chart_type_var, *chart_type_options)
+            chart_type_dropdown = OptionMenu(self.display_frame, chart_type_var, *CHART_TYPES)
             chart_type_dropdown.pack(pady=5)
 
             # X-axis Selection
@@ -716,10 +436,26 @@ class DataFilterGUI:
                     )
                     error_label.pack(pady=5)
                     return
-                try:
-                    plot_filtered_data(filtered_df, x_column, y_column, chart_type)
-                except Exception as e:
-                    messagebox.showerror("Error", f"An error occurred while plotting: {e}")
+                aggregation = 'average'
+                if chart_type == 'Bar Plot' and y_column in filtered_df.columns:
+                    # Ask user for aggregation method
+                    aggregation = simpledialog.askstring(
+                        "Aggregation", f"Choose aggregation for {y_column} (sum or average):", initialvalue="average"
+                    )
+
+                # Without filters the play dates are the whole history, whose per-Tuesday totals are kept up to date
+                session_counts = None
+                if chart_type == 'Cumulative Line Chart' and x_column == 'play_date' and not self.active_filters:
+                    session_counts = self.session_counts
+
+                # Reduce the rows to what the chart plots in the background, only drawing happens here
+                self.tasks.submit(
+                    'chart', prepare_chart_data, filtered_df, x_column, y_column, chart_type, aggregation,
+                    MAX_SCATTER_POINTS, session_counts,
+                    message="Preparing chart...",
+                    on_done=self.on_chart_prepared,
+                    on_error=self.on_chart_error
+                )
 
             graph_button = Button(
                 self.display_frame,
@@ -730,9 +466,44 @@ class DataFilterGUI:
             )
             graph_button.pack(pady=10)
 
+            self.attach_chart_canvas()
+
         except Exception as e:
             messagebox.showerror("Error", f"An error occurred: {e}")
 
+    def chart_canvas_visible(self):
+        return self.chart_canvas is not None and bool(self.chart_canvas.get_tk_widget().winfo_exists())
+
+    def attach_chart_canvas(self):
+        """
+        Shows the chart canvas below the chart controls. The figure lives as long as the window,
+        only the Tk widget is created again after the display frame has been cleared.
+        """
+        if not self.chart_canvas_visible():
+            self.chart_canvas = FigureCanvasTkAgg(self.chart_figure, master=self.display_frame)
+        self.chart_figure.clear()
+        self.chart_canvas.draw_idle()
+        self.chart_canvas.get_tk_widget().pack(fill="both", expand=True, pady=10)
+
+    def on_chart_prepared(self, chart_data):
+        # The user may have left the chart screen while the chart was being prepared
+        if not self.chart_canvas_visible():
+            return
+        try:
+            # Clearing the axes of the same figure frees the previous chart's artists
+            self.chart_figure.clear()
+            render_chart(self.chart_figure.add_subplot(), chart_data)
+            self.chart_figure.tight_layout()
+            self.chart_canvas.draw_idle()
+        except Exception as e:
+            messagebox.showerror("Error", f"An error occurred while plotting: {e}")
+
+    def on_chart_error(self, e):
+        if isinstance(e, ValueError):
+            messagebox.showinfo("Plotting Error", str(e))
+        else:
+            messagebox.showerror("Error", f"An error occurred while plotting: {e}")
+
     def clear_all_filters(self):
         """
         Clears all selected checkboxes and resets selected_filters.
@@ -740,14 +511,12 @@ class DataFilterGUI:
         # Reset the variables in all filters
         for column_vars in self.selected_filters.values():
             if isinstance(column_vars, dict):
-                if 'min' in column_vars and 'max' in column_vars:
-                    # Numerical range filter
-                    column_vars['min'].set(0)
-                    column_vars['max'].set(0)
-                else:
-                    # Categorical filters
-                    for var in column_vars.values():
-                        var.set(0)
+                # Numerical range filter
+                column_vars['min'].set(0)
+                column_vars['max'].set(0)
+            else:
+                # Categorical filters
+                column_vars.clear()
         # Clear the selected_filters dictionary
         self.selected_filters.clear()
         print("All filters have been cleared.")
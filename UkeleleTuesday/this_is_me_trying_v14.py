@@ -1,241 +1,12 @@
 import tkinter as tk
 from tkinter import filedialog, messagebox, simpledialog
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-from functools import reduce
-
-# Function to convert 'HH:MM:SS' to total seconds
-def convert_duration_to_seconds(duration_str):
-    try:
-        h, m, s = duration_str.split(':')
-        return int(h) * 3600 + int(m) * 60 + int(s)
-    except Exception:
-        return None  # Return None if conversion fails
-
-# Function definitions for filtering and plotting
-def apply_filter(df: pd.DataFrame, column: str, value: any) -> pd.DataFrame:
-    print(f"Applying filter for column '{column}' with value(s): {value}")
-
-    if df.empty:
-        print("The DataFrame is empty. Skipping filtering.")
-        return df
-
-    if column not in df.columns:
-        print(f"Warning: Column '{column}' does not exist in the DataFrame. Skipping this filter.")
-        return df
-
-    if pd.api.types.is_numeric_dtype(df[column]):
-        try:
-            if isinstance(value, tuple) and len(value) == 2:
-                min_val, max_val = value
-                return df[(df[column] >= min_val) & (df[column] <= max_val)]
-            if isinstance(value, list):
-                value = [float(v) for v in value]
-                return df[df[column].isin(value)]
-            return df[df[column] == float(value)]
-        except (ValueError, TypeError):
-            print(f"Warning: Could not apply numeric filter on column '{column}' with value '{value}'.")
-            return df
-
-    if pd.api.types.is_string_dtype(df[column]):
-        if isinstance(value, list):
-            value = [str(v).strip().lower() for v in value]
-            print(f"Normalized string filter values for column '{column}': {value}")
-            return df[df[column].str.strip().str.lower().isin(value)]
-        else:
-            value = str(value).strip().lower()
-            return df[df[column].str.strip().str.lower() == value]
-
-    print(f"Warning: Unsupported column type for '{column}'. Skipping this filter.")
-    return df
-
-def parse_filter_input(column: str, filter_value: any, column_type: any) -> any:
-    try:
-        if isinstance(filter_value, list):
-            parsed_values = []
-            for value in filter_value:
-                if pd.api.types.is_numeric_dtype(column_type):
-                    parsed_values.append(float(value.strip()))
-                elif pd.api.types.is_string_dtype(column_type):
-                    parsed_values.append(value.strip())
-            return parsed_values
-
-        if pd.api.types.is_numeric_dtype(column_type):
-            return float(filter_value.strip())
-        elif pd.api.types.is_string_dtype(column_type):
-            return filter_value.strip()
-
-        return filter_value
-    except (ValueError, AttributeError):
-        print(f"Warning: Could not parse '{filter_value}' for column '{column}' with type '{column_type}'.")
-        return None
-
-def get_user_filters(df: pd.DataFrame, filters: dict) -> pd.DataFrame:
-    if df.empty:
-        print("The DataFrame is empty. No filters can be applied.")
-        return df
-
-    parsed_filters = {}
-
-    for column, filter_values in filters.items():
-        column_type = df[column].dtype
-        parsed_filter = parse_filter_input(column, filter_values, column_type)
-
-        if parsed_filter is None:
-            print(f"Skipping filter for column '{column}' due to invalid or empty value.")
-            continue
-
-        parsed_filters[column] = parsed_filter
-
-    if not parsed_filters:
-        print("No valid filters provided.")
-        return df
-
-    filtered_df = reduce(lambda df, kv: apply_filter(df, kv[0], kv[1]), parsed_filters.items(), df)
-
-    if filtered_df.empty:
-        print("No results matched the filters.")
-        return filtered_df
-
-    return filtered_df
-
-def plot_filtered_data(df: pd.DataFrame, x_column: str, y_column: str, chart_type: str) -> None:
-    # Check if the X-axis column exists
-    if x_column not in df.columns:
-        messagebox.showerror("Error", f"Column '{x_column}' not found in filtered data.")
-        return
-
-    # Handle Histogram
-    if chart_type == 'Histogram':
-        if pd.api.types.is_numeric_dtype(df[x_column]):
-            plt.figure(figsize=(10, 6))
-            sns.histplot(df[x_column], bins=10, kde=True)
-            plt.title(f"Histogram of {x_column.capitalize()}")
-            plt.xlabel(x_column.capitalize())
-            plt.ylabel('Frequency')
-            plt.tight_layout()
-            plt.show()
-            return
-        else:
-            messagebox.showinfo("Plotting Error", f"Cannot plot histogram for non-numeric column '{x_column}'.")
-            return
-
-    # Handle Cumulative Line Chart
-    elif chart_type == 'Cumulative Line Chart':
-        if x_column not in df.columns:
-            messagebox.showerror("Error", f"The data does not contain '{x_column}' column.")
-            return
-        if not pd.api.types.is_datetime64_any_dtype(df[x_column]):
-            try:
-                df[x_column] = pd.to_datetime(df[x_column], errors='coerce')
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to convert '{x_column}' to datetime: {e}")
-                return
-        df = df.dropna(subset=[x_column])
-        df = df.sort_values(x_column)
-
-        # Group by date and count number of songs played
-        df_grouped = df.groupby(x_column).size().reset_index(name='song_count')
-        df_grouped['cumulative_count'] = df_grouped['song_count'].cumsum()
-
-        plt.figure(figsize=(10, 6))
-        plt.plot(df_grouped[x_column], df_grouped['cumulative_count'], marker='o')
-        plt.title('Cumulative Number of Songs Played Over Time')
-        plt.xlabel('Date')
-        plt.ylabel('Cumulative Number of Songs')
-        plt.xticks(rotation=45)
-        plt.tight_layout()
-        plt.show()
-        return
-
-    # Handle Pie Chart
-    elif chart_type == 'Pie Chart':
-        if x_column in df.columns:
-            counts = df[x_column].value_counts()
-            plt.figure(figsize=(8, 8))
-            counts.plot(kind='pie', autopct='%1.1f%%', startangle=90)
-            plt.title(f"Distribution of Songs by {x_column.capitalize()}")
-            plt.ylabel('')
-            plt.tight_layout()
-            plt.show()
-            return
-        else:
-            messagebox.showerror("Error", f"Column '{x_column}' not found in data.")
-            return
-
-    # Check if the Y-axis column exists
-    if y_column not in df.columns:
-        messagebox.showerror("Error", f"Column '{y_column}' not found in filtered data.")
-        return
-
-    # Both columns are numeric (Scatter Plot)
-    if chart_type == 'Scatter Plot':
-        if pd.api.types.is_numeric_dtype(df[x_column]) and pd.api.types.is_numeric_dtype(df[y_column]):
-            plt.figure(figsize=(10, 6))
-            sns.scatterplot(x=x_column, y=y_column, data=df)
-            plt.title(f"{y_column.capitalize()} vs {x_column.capitalize()}")
-            plt.xlabel(x_column.capitalize())
-            plt.ylabel(y_column.capitalize())
-            plt.tight_layout()
-            plt.show()
-            return
-        else:
-            messagebox.showinfo("Plotting Error", "Both X and Y columns must be numeric for a scatter plot.")
-            return
-
-    # X is categorical, Y is numeric (Bar Plot)
-    elif chart_type == 'Bar Plot':
-        if pd.api.types.is_numeric_dtype(df[y_column]) and (
-            pd.api.types.is_categorical_dtype(df[x_column]) or pd.api.types.is_object_dtype(df[x_column])
-        ):
-            # Ask user for aggregation method
-            aggregation = simpledialog.askstring(
-                "Aggregation", f"Choose aggregation for {y_column} (sum or average):", initialvalue="average"
-            )
-            if aggregation and aggregation.lower() == 'sum':
-                df_grouped = df.groupby(x_column)[y_column].sum().reset_index()
-                agg_label = f"Total {y_column.capitalize()}"
-            else:
-                df_grouped = df.groupby(x_column)[y_column].mean().reset_index()
-                agg_label = f"Average {y_column.capitalize()}"
-
-            plt.figure(figsize=(10, 6))
-            sns.barplot(x=x_column, y=y_column, data=df_grouped, ci=None)
-            plt.title(f"{agg_label} by {x_column.capitalize()}")
-            plt.xlabel(x_column.capitalize())
-            plt.ylabel(agg_label)
-            plt.xticks(rotation=45, ha='right')
-            plt.tight_layout()
-            plt.show()
-            return
-        else:
-            messagebox.showinfo("Plotting Error", "X must be categorical and Y must be numeric for a bar plot.")
-            return
-
-    # X is numeric, Y is categorical (Box Plot)
-    elif chart_type == 'Box Plot':
-        if pd.api.types.is_numeric_dtype(df[x_column]) and (
-            pd.api.types.is_categorical_dtype(df[y_column]) or pd.api.types.is_object_dtype(df[y_column])
-        ):
-            plt.figure(figsize=(10, 6))
-            sns.boxplot(x=y_column, y=x_column, data=df)
-            plt.title(f"Distribution of {x_column.capitalize()} by {y_column.capitalize()}")
-            plt.xlabel(y_column.capitalize())
-            plt.ylabel(x_column.capitalize())
-            plt.xticks(rotation=45, ha='right')
-            plt.tight_layout()
-            plt.show()
-            return
-        else:
-            messagebox.showinfo("Plotting Error", "X must be numeric and Y must be categorical for a box plot.")
-            return
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+from SongLibrary import CHART_TYPES, HIDDEN_COLUMNS, get_user_filters, load_dataset, plot_filtered_data
 
-    else:
-        messagebox.showinfo("Plotting Error", "Could not determine appropriate plot for selected data.")
-        return
 
-# GUI Classes
 class InputGUI:
     def __init__(self, master):
         self.master = master
@@ -385,82 +156,10 @@ class DataFilterGUI:
 
     def load_data(self):
         try:
-            # Load the CSV files
-            tab_df = pd.read_csv(self.file_paths['Tabdb']['path'])
-            play_df = pd.read_csv(self.file_paths['Playdb']['path'])
-            request_df = pd.read_csv(self.file_paths['Requestdb']['path'])
-
-            # Drop personal information columns from tab_df
-            personal_info_columns = ['tabber']  
-            tab_df = tab_df.drop(columns=personal_info_columns, errors='ignore')
-
-            # Convert 'year' to numeric and create 'decade' column in tab_df
-            tab_df['year'] = pd.to_numeric(tab_df['year'], errors='coerce')
-            tab_df = tab_df.dropna(subset=['year'])
-            tab_df['year'] = tab_df['year'].astype(int)
-            tab_df['decade'] = (tab_df['year'] // 10) * 10
-
-            # Reset index after dropping rows
-            tab_df.reset_index(drop=True, inplace=True)
-
-            # Identify the date columns in play_df 
-            date_columns = [col for col in play_df.columns if col.startswith('20')]  # Since the dates start with '20'
-
-            # Check if 'song' and 'artist' columns exist in play_df
-            if not all(col in play_df.columns for col in ['song', 'artist']):
-                messagebox.showerror("Error", "The 'playdb' file must contain 'song' and 'artist' columns.")
-                self.master.destroy()
-                return None
-
-            # Reshape play_df using melt to get 'song', 'artist', 'play_date', 'played' columns
-            play_df_long = play_df.melt(
-                id_vars=['song', 'artist'],
-                value_vars=date_columns,
-                var_name='play_date',
-                value_name='played'
-            )
-
-            # Filter out rows where 'played' is NaN or 0 (assuming 1 indicates played)
-            play_df_long = play_df_long[play_df_long['played'] == 1]
-
-            # Convert 'play_date' to datetime format
-            play_df_long['play_date'] = pd.to_datetime(play_df_long['play_date'], format='%Y%m%d', errors='coerce')
-
-            # Remove rows with invalid dates
-            play_df_long = play_df_long.dropna(subset=['play_date'])
-
-            # Standardize 'song' and 'artist' names in both DataFrames
-            for df in [tab_df, play_df_long]:
-                df['song'] = df['song'].str.strip().str.lower()
-                df['artist'] = df['artist'].str.strip().str.lower()
-
-            # Merge tab_df with play_df_long on 'song' and 'artist'
-            merged_df = pd.merge(
-                tab_df,
-                play_df_long[['song', 'artist', 'play_date']],
-                on=['song', 'artist'],
-                how='left'
-            )
-
-            # Convert 'difficulty' to numeric in merged_df
-            if 'difficulty' in merged_df.columns:
-                merged_df['difficulty'] = pd.to_numeric(merged_df['difficulty'], errors='coerce')
-
-            # Convert 'duration' from 'HH:MM:SS' to total seconds
-            if 'duration' in merged_df.columns:
-                merged_df['duration_seconds'] = merged_df['duration'].apply(convert_duration_to_seconds)
-                # Optionally, drop the original 'duration' column
-                # merged_df = merged_df.drop(columns=['duration'])
-
-            # Ensure 'gender' column exists in merged_df
-            if 'gender' not in merged_df.columns:
-                merged_df['gender'] = 'Unknown'
-            else:
-                merged_df['gender'] = merged_df['gender'].fillna('Unknown')
-
-            # Store the merged DataFrame in self.tab_df
-            self.tab_df = merged_df
-
+            # Song table joined with the play history, with duration_seconds, decade and gender filled in
+            dataset = load_dataset(self.file_paths['Tabdb']['path'], self.file_paths['Playdb']['path'],
+                                   self.file_paths['Requestdb']['path'])
+            self.tab_df = dataset['merged']
             return self.tab_df
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load data: {e}")
@@ -476,7 +175,7 @@ class DataFilterGUI:
         self.display_frame.pack(fill="both", expand=True, padx=20, pady=10)
 
         # Create buttons for each column using grid
-        columns = self.tab_df.columns.tolist()
+        columns = [col for col in self.tab_df.columns if col not in HIDDEN_COLUMNS]
         max_columns_in_row = 5  # Adjust as needed
         for idx, column_name in enumerate(columns):
             row = idx // max_columns_in_row
@@ -748,8 +447,7 @@ class DataFilterGUI:
                 text="Select Chart Type:",
                 font=("Arial", 12)
             ).pack(pady=5)
-            chart_type_options = ['Histogram', 'Cumulative Line Chart', 'Pie Chart', 'Scatter Plot', 'Bar Plot', 'Box Plot']
-            chart_type_dropdown = tk.OptionMenu(self.display_frame, chart_type_var, *chart_type_options)
+            chart_type_dropdown = tk.OptionMenu(self.display_frame, chart_type_var, *CHART_TYPES)
             chart_type_dropdown.pack(pady=5)
 
             # X-axis Selection
@@ -758,7 +456,8 @@ class DataFilterGUI:
                 text="Select X-axis Column:",
                 font=("Arial", 12)
             ).pack(pady=5)
-            x_dropdown = tk.OptionMenu(self.display_frame, x_var, *filtered_df.columns)
+            visible_columns = [col for col in filtered_df.columns if col not in HIDDEN_COLUMNS]
+            x_dropdown = tk.OptionMenu(self.display_frame, x_var, *visible_columns)
             x_dropdown.pack(pady=5)
 
             # Y-axis Selection (optional)
@@ -767,7 +466,7 @@ class DataFilterGUI:
                 text="Select Y-axis Column (optional):",
                 font=("Arial", 12)
             ).pack(pady=5)
-            y_options = [''] + list(filtered_df.columns)
+            y_options = [''] + visible_columns
             y_dropdown = tk.OptionMenu(self.display_frame, y_var, *y_options)
             y_dropdown.pack(pady=5)
 
@@ -784,8 +483,13 @@ class DataFilterGUI:
                     )
                     error_label.pack(pady=5)
                     return
+                aggregation = 'average'
+                if chart_type == 'Bar Plot':
+                    aggregation = simpledialog.askstring(
+                        "Aggregation", f"Choose aggregation for {y_column} (sum or average):", initialvalue="average"
+                    ) or 'average'
                 try:
-                    plot_filtered_data(filtered_df, x_column, y_column, chart_type)
+                    plot_filtered_data(filtered_df, x_column, y_column, chart_type, aggregation.lower())
                 except Exception as e:
                     messagebox.showerror("Error", f"An error occurred while plotting: {e}")
 
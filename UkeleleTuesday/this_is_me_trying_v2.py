@@ -1,117 +1,11 @@
 import tkinter as tk
 from tkinter import filedialog, messagebox
-import pandas as pd
-from functools import reduce
-import matplotlib.pyplot as plt
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+from SongLibrary import get_user_filters, load_song_table, plot_filtered_data
 
-# Function definitions for filtering and plotting
-def apply_filter(df: pd.DataFrame, column: str, value: any) -> pd.DataFrame:
-    print(f"Applying filter for column '{column}' with value(s): {value}")
 
-    if df.empty:
-        print("The DataFrame is empty. Skipping filtering.")
-        return df
-
-    if column not in df.columns:
-        print(f"Warning: Column '{column}' does not exist in the DataFrame. Skipping this filter.")
-        return df
-
-    if pd.api.types.is_numeric_dtype(df[column]):
-        try:
-            if isinstance(value, tuple) and len(value) == 2:
-                return df[(df[column] >= value[0]) & (df[column] <= value[1])]
-            if isinstance(value, list):
-                value = [float(v) for v in value]
-                return df[df[column].isin(value)]
-            return df[df[column] == float(value)]
-        except (ValueError, TypeError):
-            print(f"Warning: Could not apply numeric filter on column '{column}' with value '{value}'.")
-            return df
-
-    if pd.api.types.is_string_dtype(df[column]):
-        if isinstance(value, list):
-            value = [str(v).strip().lower() for v in value]
-            print(f"Normalized string filter values for column '{column}': {value}")
-            return df[df[column].str.strip().str.lower().isin(value)]
-        else:
-            value = str(value).strip().lower()
-            return df[df[column].str.strip().str.lower() == value]
-
-    print(f"Warning: Unsupported column type for '{column}'. Skipping this filter.")
-    return df
-
-def parse_filter_input(column: str, filter_value: any, column_type: any) -> any:
-    try:
-        if isinstance(filter_value, list):
-            parsed_values = []
-            for value in filter_value:
-                if pd.api.types.is_numeric_dtype(column_type):
-                    parsed_values.append(float(value.strip()))
-                elif pd.api.types.is_string_dtype(column_type):
-                    parsed_values.append(value.strip())
-            return parsed_values
-
-        if pd.api.types.is_numeric_dtype(column_type):
-            return float(filter_value.strip())
-        elif pd.api.types.is_string_dtype(column_type):
-            return filter_value.strip()
-
-        return filter_value
-    except (ValueError, AttributeError):
-        print(f"Warning: Could not parse '{filter_value}' for column '{column}' with type '{column_type}'.")
-        return None
-
-def get_user_filters(df: pd.DataFrame, filters: dict) -> pd.DataFrame:
-    if df.empty:
-        print("The DataFrame is empty. No filters can be applied.")
-        return df
-
-    parsed_filters = {}
-
-    for column, filter_values in filters.items():
-        column_type = df[column].dtype
-        parsed_filter = parse_filter_input(column, filter_values, column_type)
-
-        if not parsed_filter:
-            print(f"Skipping filter for column '{column}' due to invalid or empty value.")
-            continue
-
-        parsed_filters[column] = parsed_filter
-
-    if not parsed_filters:
-        print("No valid filters provided.")
-        return df
-
-    filtered_df = reduce(lambda df, kv: apply_filter(df, kv[0], kv[1]), parsed_filters.items(), df)
-
-    if filtered_df.empty:
-        print("No results matched the filters.")
-        return filtered_df
-
-    return filtered_df
-
-def plot_filtered_data(df: pd.DataFrame, x_column: str, y_column: str) -> None:
-    if x_column not in df.columns or y_column not in df.columns:
-        print(f"Error: Columns '{x_column}' or '{y_column}' not found in filtered data.")
-        return
-
-    plt.figure(figsize=(10, 6))
-
-    if pd.api.types.is_numeric_dtype(df[x_column]) and pd.api.types.is_numeric_dtype(df[y_column]):
-        plt.plot(df[x_column], df[y_column], marker="o", linestyle="-", color="b")
-        plt.title(f"{y_column} vs {x_column}")
-        plt.xlabel(x_column)
-        plt.ylabel(y_column)
-    else:
-        df_grouped = df.groupby(x_column)[y_column].count()
-        df_grouped.plot(kind="bar", color="c")
-        plt.title(f"{y_column} count by {x_column}")
-        plt.xlabel(x_column)
-        plt.ylabel(f"Count of {y_column}")
-
-    plt.show()
-
-# GUI Classes
 class InputGUI:
     def __init__(self, master):
         self.master = master
@@ -260,7 +154,7 @@ class DataFilterGUI:
     def load_data(self):
         # Load the CSV files using the paths from file_paths
         try:
-            tab_df = pd.read_csv(self.file_paths['Tabdb']['path'])
+            tab_df = load_song_table(self.file_paths['Tabdb']['path'])
             # You can also load Playdb and Requestdb if needed
             return tab_df
         except Exception as e:
@@ -487,7 +381,10 @@ class DataFilterGUI:
                 )
                 error_label.pack(pady=5)
                 return
-            plot_filtered_data(filtered_df, x_column, y_column)
+            try:
+                plot_filtered_data(filtered_df, x_column, y_column)
+            except ValueError as e:
+                messagebox.showerror("Error", f"An error occurred while plotting: {e}")
 
         graph_button = tk.Button(
             self.display_frame,
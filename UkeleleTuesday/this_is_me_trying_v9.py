@@ -1,167 +1,11 @@
 import tkinter as tk
 from tkinter import filedialog, messagebox, simpledialog
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-from functools import reduce
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+from SongLibrary import get_user_filters, infer_chart_type, load_song_table, plot_filtered_data
 
-# Function definitions for filtering and plotting
-def apply_filter(df: pd.DataFrame, column: str, value: any) -> pd.DataFrame:
-    print(f"Applying filter for column '{column}' with value(s): {value}")
 
-    if df.empty:
-        print("The DataFrame is empty. Skipping filtering.")
-        return df
-
-    if column not in df.columns:
-        print(f"Warning: Column '{column}' does not exist in the DataFrame. Skipping this filter.")
-        return df
-
-    if pd.api.types.is_numeric_dtype(df[column]):
-        try:
-            if isinstance(value, tuple) and len(value) == 2:
-                return df[(df[column] >= value[0]) & (df[column] <= value[1])]
-            if isinstance(value, list):
-                value = [float(v) for v in value]
-                return df[df[column].isin(value)]
-            return df[df[column] == float(value)]
-        except (ValueError, TypeError):
-            print(f"Warning: Could not apply numeric filter on column '{column}' with value '{value}'.")
-            return df
-
-    if pd.api.types.is_string_dtype(df[column]):
-        if isinstance(value, list):
-            value = [str(v).strip().lower() for v in value]
-            print(f"Normalized string filter values for column '{column}': {value}")
-            return df[df[column].str.strip().str.lower().isin(value)]
-        else:
-            value = str(value).strip().lower()
-            return df[df[column].str.strip().str.lower() == value]
-
-    print(f"Warning: Unsupported column type for '{column}'. Skipping this filter.")
-    return df
-
-def parse_filter_input(column: str, filter_value: any, column_type: any) -> any:
-    try:
-        if isinstance(filter_value, list):
-            parsed_values = []
-            for value in filter_value:
-                if pd.api.types.is_numeric_dtype(column_type):
-                    parsed_values.append(float(value.strip()))
-                elif pd.api.types.is_string_dtype(column_type):
-                    parsed_values.append(value.strip())
-            return parsed_values
-
-        if pd.api.types.is_numeric_dtype(column_type):
-            return float(filter_value.strip())
-        elif pd.api.types.is_string_dtype(column_type):
-            return filter_value.strip()
-
-        return filter_value
-    except (ValueError, AttributeError):
-        print(f"Warning: Could not parse '{filter_value}' for column '{column}' with type '{column_type}'.")
-        return None
-
-def get_user_filters(df: pd.DataFrame, filters: dict) -> pd.DataFrame:
-    if df.empty:
-        print("The DataFrame is empty. No filters can be applied.")
-        return df
-
-    parsed_filters = {}
-
-    for column, filter_values in filters.items():
-        column_type = df[column].dtype
-        parsed_filter = parse_filter_input(column, filter_values, column_type)
-
-        if not parsed_filter:
-            print(f"Skipping filter for column '{column}' due to invalid or empty value.")
-            continue
-
-        parsed_filters[column] = parsed_filter
-
-    if not parsed_filters:
-        print("No valid filters provided.")
-        return df
-
-    filtered_df = reduce(lambda df, kv: apply_filter(df, kv[0], kv[1]), parsed_filters.items(), df)
-
-    if filtered_df.empty:
-        print("No results matched the filters.")
-        return filtered_df
-
-    return filtered_df
-
-def plot_filtered_data(df: pd.DataFrame, x_column: str, y_column: str) -> None:
-    if x_column not in df.columns or y_column not in df.columns:
-        messagebox.showerror("Error", f"Columns '{x_column}' or '{y_column}' not found in filtered data.")
-        return
-
-    # Both columns are numeric
-    if pd.api.types.is_numeric_dtype(df[x_column]) and pd.api.types.is_numeric_dtype(df[y_column]):
-        plt.figure(figsize=(10, 6))
-        sns.scatterplot(x=x_column, y=y_column, data=df)
-        plt.title(f"{y_column.capitalize()} vs {x_column.capitalize()}")
-        plt.xlabel(x_column.capitalize())
-        plt.ylabel(y_column.capitalize())
-        plt.tight_layout()
-        plt.show()
-        return
-
-    # X is categorical, Y is numeric
-    elif pd.api.types.is_numeric_dtype(df[y_column]) and (pd.api.types.is_categorical_dtype(df[x_column]) or pd.api.types.is_object_dtype(df[x_column])):
-        # Ask user for aggregation method
-        aggregation = simpledialog.askstring("Aggregation", f"Choose aggregation for {y_column} (sum or average):", initialvalue="average")
-        if aggregation and aggregation.lower() == 'sum':
-            df_grouped = df.groupby(x_column)[y_column].sum().reset_index()
-            agg_label = f"Total {y_column.capitalize()}"
-        else:
-            df_grouped = df.groupby(x_column)[y_column].mean().reset_index()
-            agg_label = f"Average {y_column.capitalize()}"
-
-        plt.figure(figsize=(10, 6))
-        sns.barplot(x=x_column, y=y_column, data=df_grouped, ci=None)
-        plt.title(f"{agg_label} by {x_column.capitalize()}")
-        plt.xlabel(x_column.capitalize())
-        plt.ylabel(agg_label)
-        plt.xticks(rotation=45, ha='right')
-        plt.tight_layout()
-        plt.show()
-        return
-
-    # X is numeric, Y is categorical
-    elif pd.api.types.is_numeric_dtype(df[x_column]) and (pd.api.types.is_categorical_dtype(df[y_column]) or pd.api.types.is_object_dtype(df[y_column])):
-        plt.figure(figsize=(10, 6))
-        sns.boxplot(x=y_column, y=x_column, data=df)
-        plt.title(f"Distribution of {x_column.capitalize()} by {y_column.capitalize()}")
-        plt.xlabel(y_column.capitalize())
-        plt.ylabel(x_column.capitalize())
-        plt.xticks(rotation=45, ha='right')
-        plt.tight_layout()
-        plt.show()
-        return
-
-    # Both columns are categorical
-    elif (pd.api.types.is_categorical_dtype(df[x_column]) or pd.api.types.is_object_dtype(df[x_column])) and (pd.api.types.is_categorical_dtype(df[y_column]) or pd.api.types.is_object_dtype(df[y_column])):
-        # Create a crosstab of counts
-        crosstab = pd.crosstab(df[x_column], df[y_column])
-        plt.figure(figsize=(10, 6))
-        crosstab.plot(kind='bar', stacked=True, figsize=(10, 6), legend=False)
-        plt.title(f"{y_column.capitalize()} Count by {x_column.capitalize()}")
-        plt.xlabel(x_column.capitalize())
-        plt.ylabel(f"Count of {y_column.capitalize()}")
-        plt.xticks(rotation=45, ha='right')
-        plt.tight_layout()
-        # Place legend outside the plot
-        plt.legend(title=y_column.capitalize(), bbox_to_anchor=(1.05, 1), loc='upper left')
-        plt.show()
-        return
-
-    else:
-        messagebox.showinfo("Plotting Error", "Could not determine appropriate plot for selected data.")
-        return
-
-
-# GUI Classes
 class InputGUI:
     def __init__(self, master):
         self.master = master
@@ -312,7 +156,7 @@ class DataFilterGUI:
     def load_data(self):
         # Load the CSV files using the paths from file_paths
         try:
-            tab_df = pd.read_csv(self.file_paths['Tabdb']['path'])
+            tab_df = load_song_table(self.file_paths['Tabdb']['path'])
             # You can also load Playdb and Requestdb if needed
             return tab_df
         except Exception as e:
@@ -567,7 +411,17 @@ class DataFilterGUI:
                     error_label.pack(pady=5)
                     return
                 try:
-                    plot_filtered_data(filtered_df, x_column, y_column)
+                    chart_type = infer_chart_type(filtered_df, x_column, y_column)
+                except ValueError as e:
+                    messagebox.showerror("Error", f"An error occurred while plotting: {e}")
+                    return
+                aggregation = 'average'
+                if chart_type == 'Bar Plot':
+                    aggregation = simpledialog.askstring(
+                        "Aggregation", f"Choose aggregation for {y_column} (sum or average):", initialvalue="average"
+                    ) or 'average'
+                try:
+                    plot_filtered_data(filtered_df, x_column, y_column, chart_type, aggregation.lower())
                 except Exception as e:
                     messagebox.showerror("Error", f"An error occurred while plotting: {e}")
 
@@ -3,6 +3,13 @@ import pandas as pd
 import calendar as cal
 import matplotlib.pyplot as plt
 import numpy as np
+import os
+import sys
+
+# The shared data modules live in src/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+from DateParsing import parse_yyyymmdd
+from TermMatching import normalize_multi_value_columns
 
 #Read File
 all_songs = pd.read_csv(r"C:\Users\rebec\OneDrive\Documentos\UCD First Trimester\Programming for Analytics\group assignment\tabdb_v2.csv", header=0)
@@ -55,28 +62,11 @@ plt.show()
 
 
 #BAR CHART SONGS BY LANGUAGE
-# Function to standardize language data points
-def standardized_languages(languages_string):
-    languages = languages_string.split(",")  # Split by comma since this is a csv file
-    languages.sort()  # Sort alphabetically
-    return ",".join(languages)  # Join back to the column
-
-# Replace NaN and Blanks with the new category called 'unknown' to make it easier to understand
-all_songs['language'] = all_songs['language'].fillna('unknown').replace("(Blanks)", "unknown")
-
-# Apply the standardization function only to all values that aren't in the unknown category
-all_songs['language'] = all_songs['language'].apply(
-    lambda x: standardized_languages(x) if x != 'unknown' else x
-)
-
-# Fixing the language column to count individual occurrences and npt have groupped entries such as english, spanish
-# Filter out 'unknown'
-filtered_languages = all_songs[all_songs['language'] != 'unknown']['language']
+# Put the language column in its canonical form (sorted, comma-joined terms) once and index each language
+language_terms = normalize_multi_value_columns(all_songs)['language']
 
-# Split and flatten the entries
-flattened_languages = filtered_languages.str.split(",").explode()
-
-language_counter = flattened_languages.value_counts()
+# Songs in several languages count once for each language, blanks and 'unknown' are left out
+language_counter = language_terms.term_counts(exclude=['(Blanks)', 'unknown'])
 
 # Define the color palette for the languages
 color_palette = {
@@ -178,27 +168,12 @@ plt.tight_layout()
 plt.show()
 
 #cumulative line chart of the number of songs played each Tuesday for the dates provided
-all_songs['date'] = all_songs['date'].dropna().astype(int).astype(str)  # Remove NaN, convert to int, then string
-
-# Revised loop for reformatting dates
-for i, raw_date in enumerate(all_songs['date']):
-    try:
-        raw_date = str(raw_date)  # Ensure raw_date is a string
-        year = raw_date[:4]
-        month = raw_date[4:6]
-        day = raw_date[6:]
-        formatted_date = f"{year}-{int(month):02d}-{int(day):02d}"
-        all_songs.at[i, 'date'] = formatted_date
-    except (ValueError, IndexError):  # Handle invalid or incomplete date strings
-        all_songs.at[i, 'date'] = None
+# Parse the YYYYMMDD dates in one pass, invalid or missing dates become NaT
+all_songs['date'] = parse_yyyymmdd(all_songs['date'])
 
 # Remove rows with invalid or missing dates
 all_songs = all_songs.dropna(subset=['date'])
 
-# Convert to datetime
-all_songs['date'] = pd.to_datetime(all_songs['date'], errors='coerce')
-all_songs = all_songs.dropna(subset=['date'])
-
 # Generate a cumulative count
 cumulative_counter = all_songs['date'].value_counts().sort_index().cumsum()
 